@@ -1,19 +1,33 @@
+import os
+import uuid
+from functools import partial
 import streamlit as st
-import pandas as pd
 from datetime import date
-from io import BytesIO
-from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
+from timing import span, start_metrics_server
+from background import DONE, get_default_manager, report_steps
+from ledger import get_default_ledger
+from roster import Roster, find_roster, student_key, student_label
+
+# 화면 한 번 그리는 시간 (Streamlit은 입력이 바뀔 때마다 스크립트 전체를 다시 실행)
+page_span = span("page_render")
+start_metrics_server()
 
 st.set_page_config(page_title="자동 결석 신고서 생성기 (Excel)", layout="centered")
 st.title("📝 자동 결석 신고서 생성 (Excel 형식)")
 st.caption("A4 용지 한 페이지에 인쇄되도록 최적화된 Excel 파일을 생성합니다.")
 
+# 생성은 재실행과 무관하게 유지되는 공용 작업 풀에서 진행 (세션별로 돌아가며 처리)
+job_manager = get_default_manager()
+owner = st.session_state.setdefault("job_owner", uuid.uuid4().hex)
+
+# 신고서 한 건은 이 시간 안에 끝나면 바로 다운로드 버튼을 보여 주고, 아니면 작업 목록으로 넘김
+REPORT_WAIT_SECONDS = 3
+
 # ----------------------------------------------------
 # A. 데이터 입력값 설정
 # ----------------------------------------------------
 
-# 예시 학생 명단 (선택 박스용)
+# 예시 학생 명단 (명단 파일이 없을 때 사용)
 STUDENTS = {
     "10101": {"학년": 1, "반": 1, "번호": 1, "이름": "김철수"},
     "10102": {"학년": 1, "반": 1, "번호": 2, "이름": "이영희"},
@@ -21,21 +35,38 @@ STUDENTS = {
     # 실제 학생 명단으로 대체해야 합니다 (예: Google Sheet에서 불러오기)
 }
 
+# 학생 명단 파일(ROSTER_PATH, CSV 또는 xlsx, 열: 학년, 반, 번호, 이름 [+ 학번])은
+# 파일이 바뀔 때만 다시 읽고, 학년/반·검색 색인도 그때 한 번만 만듦
+roster = find_roster()
+if roster is None:
+    roster = Roster(STUDENTS)
+
 st.subheader("1. 결석 학생 정보 입력")
-student_options = {f"{s['학년']}-{s['반']}-{s['번호']} {s['이름']}": k for k, s in STUDENTS.items()}
+query = st.text_input("이름 또는 학번으로 검색", "")
+if query.strip():
+    student_keys = roster.search(query)
+else:
+    col_grade, col_class = st.columns(2)
+    with col_grade:
+        grade = st.selectbox("학년", options=roster.grades)
+    with col_class:
+        class_no = st.selectbox("반", options=roster.classes(grade))
+    student_keys = roster.in_class(grade, class_no)
+
 selected_key = st.selectbox(
     "학생 선택",
-    options=list(student_options.keys()),
+    options=student_keys,
+    format_func=roster.label,
     index=None
 )
 
 if selected_key:
-    student_data = STUDENTS[student_options[selected_key]]
-    
-    # 총 일수 계산
-    def calculate_days(start, end):
-        if start > end: return 0
-        return (end - start).days + 1
+    # openpyxl을 쓰는 신고서 모듈과 NumPy를 쓰는 학사 일정 모듈은 학생을 고른 뒤에 불러옴 (첫 화면 로딩 단축)
+    from report import XLSX_MIME, report_file_name
+    from report_cache import get_default_cache
+    from school_calendar import calculate_days, calendar_days
+
+    student_data = roster[selected_key]
         
     st.subheader("2. 결석 기간 및 사유")
     
@@ -46,7 +77,7 @@ if selected_key:
         end_date = st.date_input("종료일", date.today())
     
     total_days = calculate_days(start_date, end_date)
-    st.markdown(f"**👉 총 결석 예상 일수 (단순 계산): {total_days}일**")
+    st.markdown(f"**👉 총 결석 예상 일수 (공휴일·휴업일 제외): {total_days}일** (달력상 {calendar_days(start_date, end_date)}일)")
         
     reason = st.text_area("결석 사유", "독감으로 인한 자가 격리")
     
@@ -75,328 +106,6 @@ if selected_key:
         parent_opinion = ""
 
     
-    # ----------------------------------------------------
-    # B. Excel 생성 및 PDF 양식 서식 적용 함수
-    # ----------------------------------------------------
-    
-    def create_excel_report(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "결석신고서"
-        
-        # --- 서식 정의 ---
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
-        center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
-        title_font = Font(size=14, bold=True)
-        header_font = Font(bold=True)
-        
-        # 1. A, B열 너비 축소 / C, D, E열 확대 (요청 1 반영)
-        ws.column_dimensions['A'].width = 10
-        ws.column_dimensions['B'].width = 10
-        ws.column_dimensions['C'].width = 18
-        ws.column_dimensions['D'].width = 18
-        ws.column_dimensions['E'].width = 18
-        
-        # --- 1. 문서 제목 및 안내 ---
-        current_row = 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "학업성적관리규정 [결석계 서식]"
-        ws[f'A{current_row}'].font = Font(size=10)
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='right')
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "결 석 신 고 서"
-        ws[f'A{current_row}'].font = title_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws.row_dimensions[current_row].height = 25
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "※ 결석신고서는 결석한 날로부터 3일 이내에 제출하여 학교의 승인을 받아야 합니다."
-        ws[f'A{current_row}'].font = Font(size=9)
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='left', wrap_text=True)
-        ws.row_dimensions[current_row].height = 15
-
-        # --- 2. 학생 정보 ---
-        current_row += 1
-        
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "학생"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = f"{data['학년']}학년 {data['반']}반 {data['번호']}번"
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        
-        # --- 3. 기간 ---
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "기간"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        period_str = f"{data['시작일'].strftime('2025년 %m월 %d일')}부터 ~ {data['종료일'].strftime('2025년 %m월 %d일')}까지 ({data['총_일수']}일간)"
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = period_str
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        ws.row_dimensions[current_row].height = 20
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "※ 결석 기간 중 공휴일 또는 학교 휴무일은 결석일 수에 포함하지 않습니다."
-        ws[f'A{current_row}'].font = Font(size=9)
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='left', wrap_text=True)
-        ws.row_dimensions[current_row].height = 15
-
-        # --- 4. 성명 ---
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "성명"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = data['이름']
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        
-        # --- 5. 사유 ---
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "사유"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = data['사유']
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        ws.row_dimensions[current_row].height = 60 
-        
-        # --- 6. 붙임 서류 ---
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "붙임 서류"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        doc_list = []
-        doc_list.append(f"[{'X' if has_diagnosis else ' '}] 진단서 또는 진료 확인서 (3일 이상인 경우 꼭 첨부)")
-        doc_list.append(f"[] 병원처방전 또는 약봉투") 
-        doc_list.append(f"[{'X' if has_opinion else ' '}] 보건결석 학부모 의견서")
-        
-        is_none = not (has_diagnosis or has_opinion or etc_doc_val.strip())
-        doc_list.append(f"[{'X' if is_none else ' '}] 없음")
-        
-        if etc_doc_val.strip():
-            doc_list.append(f"[{'X'}] 기타 ({etc_doc_val})")
-        else:
-             doc_list.append(f"[] 기타 ()")
-
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = '\n'.join(doc_list)
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        ws.row_dimensions[current_row].height = 70
-        
-        # --- 7. 유의사항 및 보호자 연서 ---
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "※ 규정된 증빙서류를 첨부하지 않으면 '미인정(무단)' 결석 처리됩니다."
-        ws[f'A{current_row}'].font = Font(size=9)
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='left', wrap_text=True)
-        ws.row_dimensions[current_row].height = 15
-
-        # 요청 3: 보호자 연서 문구 행 높이 조정
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = f"위와 같이 결석하고자 하였기에 보호자 연서로 신고합니다. \n\n {date.today().strftime('2025년 %m월 %d일')}"
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='right', vertical='bottom', wrap_text=True)
-        ws.row_dimensions[current_row].height = 40 # 행 높이 충분히 높임
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:C{current_row}')
-        ws[f'A{current_row}'] = f"학생 성명: {data['이름']} (서명 또는 인)"
-        ws.merge_cells(f'D{current_row}:E{current_row}')
-        ws[f'D{current_row}'] = "보호자 성명: (서명 또는 인)"
-        ws[f'A{current_row}'].alignment = left_align
-        ws[f'D{current_row}'].alignment = left_align
-        ws.row_dimensions[current_row].height = 30
-        
-        # --- 8. 담임교사 확인서 (새로운 섹션) ---
-        current_row += 2
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "담임교사 확인서"
-        ws[f'A{current_row}'].font = title_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws.row_dimensions[current_row].height = 25
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "결석 종류"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        chk_질병 = 'X' if data['결석_종류'] == '질병' else ' '
-        chk_인정 = 'X' if data['결석_종류'] == '인정' else ' '
-        chk_기타 = 'X' if data['결석_종류'] == '기타' else ' '
-        
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = f"[{chk_질병}] 질병  [{chk_인정}] 인정  [{chk_기타}] 기타"
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        
-        # 확인 방법 
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "확인 방법"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].alignment = center_align
-        ws[f'A{current_row}'].border = thin_border
-        
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = "[X] 제출된 증빙서류로 확인"
-        ws[f'C{current_row}'].alignment = left_align
-        ws[f'C{current_row}'].border = thin_border
-        
-        # --- 9. 교사 확인 텍스트 및 날짜 ---
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "위의 신고 내용이 사실과 같음을 확인합니다." 
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='left', vertical='center')
-        ws.row_dimensions[current_row].height = 20
-
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = f"{date.today().strftime('2025년 %m월 %d일')}"
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='right', vertical='bottom')
-        ws.row_dimensions[current_row].height = 25
-
-
-        # --- 10. 결재 라인 ---
-        current_row += 1
-        
-        # 결재 라인 헤더 (요청 2: 담임교사 B열만 차지)
-        ws[f'B{current_row}'] = "학급 담임"
-        ws[f'B{current_row}'].border = thin_border
-        ws[f'B{current_row}'].alignment = center_align
-        
-        ws[f'C{current_row}'] = "출결 담당"
-        ws[f'C{current_row}'].border = thin_border
-        ws[f'C{current_row}'].alignment = center_align
-        
-        ws[f'D{current_row}'] = "교무 부장"
-        ws[f'D{current_row}'].border = thin_border
-        ws[f'D{current_row}'].alignment = center_align
-        
-        ws[f'E{current_row}'] = "교감"
-        ws[f'E{current_row}'].border = thin_border
-        ws[f'E{current_row}'].alignment = center_align
-        
-        # 최종 서명/결재 빈칸 (공간 확보)
-        current_row += 1
-        for col in ['B', 'C', 'D', 'E']: # B열부터 시작
-            ws[f'{col}{current_row}'].border = thin_border
-            ws.row_dimensions[current_row].height = 30
-        
-        # 학교장 귀하
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "대동세무고등학교장 귀하"
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='right', vertical='center')
-        ws.row_dimensions[current_row].height = 20
-        
-        
-        # ----------------------------------------------------------------------------------
-        # --- 11. 2페이지 내용 (규정 상세 및 보호자 의견서) 추가 --- (요청 4 반영)
-        # ----------------------------------------------------------------------------------
-        
-        # 11-1. 규정 상세
-        current_row += 2
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "※ 결석 종류별 증빙자료 관련 규정 안내"
-        ws[f'A{current_row}'].font = Font(size=10, bold=True)
-        ws[f'A{current_row}'].fill = PatternFill(start_color="EEEEEE", end_color="EEEEEE", fill_type="solid")
-        ws[f'A{current_row}'].alignment = left_align
-        ws.row_dimensions[current_row].height = 20
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        rule_text = (
-            "1. 질병결석 2일 이내: 결석신고서와 담임교사 확인서\n"
-            "2. 질병결석 3일 이상: 결석신고서, 담임교사 확인서 및 ① 의사의 진단서, ② 의견서(진료확인서 등) 중 택1\n"
-            "3. 보건결석: 의사소견서 또는 학부모 의견서 첨부 (월 1일만 인정)\n"
-            "4. 그 외 인정 및 기타결석: 사유를 인정할 수 있는 증빙서류 첨부\n"
-            "5. 고사기간 중의 질병결석: 의사의 진단서 반드시 첨부"
-        )
-        ws[f'A{current_row}'] = rule_text
-        ws[f'A{current_row}'].font = Font(size=9)
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-        ws[f'A{current_row}'].border = thin_border
-        ws.row_dimensions[current_row].height = 80
-        
-        # 11-2. 보호자 의견서
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = "보호자 의견서 (보건결석인 경우만 작성)"
-        ws[f'A{current_row}'].font = Font(size=10, bold=True)
-        ws[f'A{current_row}'].fill = PatternFill(start_color="CCCCFF", end_color="CCCCFF", fill_type="solid")
-        ws[f'A{current_row}'].alignment = left_align
-        ws.row_dimensions[current_row].height = 20
-
-        # 증상/의견 테이블 시작
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "증상"
-        ws[f'A{current_row}'].border = thin_border
-        ws[f'A{current_row}'].alignment = center_align
-
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = symptom if data['결석_종류'] == '인정' else "(해당 없음)"
-        ws[f'C{current_row}'].border = thin_border
-        ws[f'C{current_row}'].alignment = left_align
-        ws.row_dimensions[current_row].height = 30
-        
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:B{current_row}')
-        ws[f'A{current_row}'] = "부모님 의견"
-        ws[f'A{current_row}'].border = thin_border
-        ws[f'A{current_row}'].alignment = center_align
-
-        ws.merge_cells(f'C{current_row}:E{current_row}')
-        ws[f'C{current_row}'] = parent_opinion if data['결석_종류'] == '인정' else "(해당 없음)"
-        ws[f'C{current_row}'].border = thin_border
-        ws[f'C{current_row}'].alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-        ws.row_dimensions[current_row].height = 50
-        
-        # 최종 확인 문구
-        current_row += 1
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = f"학생과의 관계: (      ) 보호자 성명: (서명 또는 인)"
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='right', vertical='bottom')
-        ws.row_dimensions[current_row].height = 30
-
-        # 인쇄 영역 설정 (A4 1페이지에 맞춤)
-        ws.page_setup.fitToPages = True
-        ws.page_setup.fitToWidth = 1 
-        ws.page_setup.fitToHeight = 0 
-        ws.page_setup.orientation = 'portrait' 
-        
-        ws.print_area = f'A1:E{current_row}'
-
-        return wb
-
     # ----------------------------------------------------
     # C. 파일 생성 및 다운로드 (이전과 동일)
     # ----------------------------------------------------
@@ -409,29 +118,168 @@ if selected_key:
         "사유": reason, "결석_종류": absence_type
     }
 
+    # 결석 대장으로 규정 위반·기간 중복 확인 (생성 전에 미리 안내)
+    ledger = get_default_ledger()
+    for finding in ledger.check(final_data, has_diagnosis, has_opinion, etc_doc_val, key=selected_key):
+        st.warning(f"**[{finding.rule}]** {finding.message}")
+
     st.markdown("---")
     if st.button("결석 신고서 생성 및 다운로드 (Excel)", use_container_width=True):
         st.subheader("5. 결과 확인")
         
-        # Excel 문서 생성
-        workbook = create_excel_report(final_data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion)
-        
-        # BytesIO를 사용하여 메모리에 문서를 저장하고 Streamlit 다운로드에 사용
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        
-        file_name = f"결석신고서_Excel_{final_data['이름']}_{final_data['시작일'].strftime('%Y%m%d')}.xlsx"
-        
-        st.download_button(
-            label=f"📥 {file_name} 다운로드",
-            data=excel_buffer,
-            file_name=file_name,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
-        st.success("Excel 신고서 생성이 완료되었습니다! 다운로드 후 인쇄하여 사용하세요.")
-        st.balloons()
+        # Excel 문서 생성 (고정 양식 템플릿에 입력값만 채워 생성, 같은 내용이면 캐시에서 바로 반환)
+        # 신고서를 다 만든 뒤에만 결석 대장에 기록 (실패하면 남기지 않음)
+        file_name = report_file_name(final_data)
+        job = job_manager.submit(
+            owner, file_name, 1,
+            report_steps(final_data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion,
+                         on_done=partial(ledger.record, final_data, has_diagnosis, has_opinion, etc_doc_val,
+                                         key=selected_key)),
+            file_name, XLSX_MIME)
+        
+        if job.wait(REPORT_WAIT_SECONDS) and job.status == DONE:
+            with span("download"):
+                st.download_button(
+                    label=f"📥 {file_name} 다운로드",
+                    data=job.result_bytes(),
+                    file_name=file_name,
+                    mime=XLSX_MIME,
+                    use_container_width=True
+                )
+            job_manager.remove(job.id)
+            st.success("Excel 신고서 생성이 완료되었습니다! 다운로드 후 인쇄하여 사용하세요.")
+            cache_stats = get_default_cache().stats()
+            st.caption(f"신고서 캐시: 적중 {cache_stats['hits']}회 / 새로 생성 {cache_stats['misses']}회")
+            st.balloons()
+        elif job.finished:
+            st.error(f"신고서 생성에 실패했습니다: {job.error}")
+            job_manager.remove(job.id)
+        else:
+            st.info(f"생성 작업이 밀려 있습니다. 아래 '생성 작업' 목록에서 완료되면 내려받을 수 있습니다. (작업 {job.id})")
 
 else:
     st.info("먼저 결석한 학생을 선택해주세요.")
+
+# ----------------------------------------------------
+# D. 학급 전체 일괄 다운로드 (ZIP 묶음 / 학생별 시트 통합 문서)
+# ----------------------------------------------------
+
+st.markdown("---")
+with st.expander("📦 여러 학생 신고서 일괄 다운로드"):
+    st.caption("batch.py와 같은 형식의 CSV(학년, 반, 번호, 이름, 시작일, 종료일, 사유, 결석_종류)를 올리면 한 번에 내려받을 수 있습니다.")
+    bundle_csv = st.file_uploader("결석 목록 CSV", type=["csv"])
+    bundle_kind = st.radio("묶음 형식", options=["ZIP (학생별 파일)", "Excel 하나 (학생별 시트)"], horizontal=True)
+
+    if bundle_csv is not None and st.button("묶음 생성", use_container_width=True):
+        import io
+        from batch import iter_jobs
+        from background import bundle_steps
+        from report import XLSX_MIME
+
+        # 입력 행은 여기서 읽어 건수만 알아 두고, 생성은 작업 풀에서 진행
+        # (묶음은 조각 단위로 임시 파일에 기록되어 신고서 수와 무관하게 메모리 일정)
+        report_jobs = list(iter_jobs(io.TextIOWrapper(bundle_csv, encoding='utf-8-sig', newline='')))
+        if bundle_kind.startswith("ZIP"):
+            kind, bundle_name, bundle_mime = "zip", "결석신고서_묶음.zip", "application/zip"
+        else:
+            kind, bundle_name, bundle_mime = "workbook", "결석신고서_묶음.xlsx", XLSX_MIME
+
+        # batch.py와 같이 결석 대장으로 규정·기간 중복을 확인해 안내하고, 묶음이 끝까지 만들어진 뒤에 기록
+        ledger = get_default_ledger()
+        entries = [(job['data'], job['has_diagnosis'], job['has_opinion'], job['etc_doc_val'],
+                    student_key(job['data'], roster), job['issue_date']) for job in report_jobs]
+        findings = [f"{student_label(data)} {data['시작일']} **[{finding.rule}]** {finding.message}"
+                    for data, has_diagnosis, has_opinion, etc_doc_val, key, issue_date in entries
+                    for finding in ledger.check(data, has_diagnosis, has_opinion, etc_doc_val, key, issue_date)]
+        if findings:
+            st.warning("  \n".join(findings))
+
+        job_manager.submit(owner, bundle_name, len(report_jobs),
+                           bundle_steps(report_jobs, kind, on_done=lambda entries=entries: ledger.record_many(entries)),
+                           bundle_name, bundle_mime)
+        st.success(f"{len(report_jobs)}건 묶음 생성을 시작했습니다. 아래 '생성 작업' 목록에서 진행 상황을 확인하세요.")
+
+with st.expander("🗂️ 출결 시스템 내보내기 파일로 빠진 신고서 만들기"):
+    st.caption("출결 시스템에서 내려받은 결석 목록(CSV/xlsx, 하루 한 행)을 올리면 결석 대장에 없는 결석만 찾아 "
+               "결석 종류·기간을 채운 신고서를 ZIP 하나로 만듭니다.")
+    export_file = st.file_uploader("출결 내보내기 파일", type=["csv", "xlsx"])
+    export_encoding = st.radio("CSV 문자 인코딩", options=["utf-8-sig", "cp949"], horizontal=True)
+
+    if export_file is not None and st.button("빠진 신고서 찾아서 생성", use_container_width=True):
+        import tempfile
+        from attendance import find_missing, record_jobs, render_jobs
+        from background import bundle_steps
+
+        # 큰 파일도 조각씩 읽도록 임시 파일에 옮긴 뒤 경로로 넘김
+        suffix = os.path.splitext(export_file.name)[1].lower()
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            for block in iter(lambda: export_file.read(1024 * 1024), b''):
+                tmp.write(block)
+        try:
+            missing_jobs, import_stats = find_missing(tmp.name, roster, get_default_ledger(), encoding=export_encoding)
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"파일을 읽을 수 없습니다: {e}")
+            missing_jobs, import_stats = [], None
+        finally:
+            os.remove(tmp.name)
+
+        if import_stats is not None:
+            st.caption(f"{import_stats['rows']}행 → 결석 기간 {import_stats['periods']}건 "
+                       f"(신고서 있음 {import_stats['existing']}건, 일부만 있음 {import_stats['partial']}건) "
+                       f"· 명단에 없는 학생 {import_stats['unknown_student']}행 제외")
+        if missing_jobs:
+            bundle_name = "결석신고서_빠진목록.zip"
+            # 묶음이 끝까지 만들어진 뒤에만 결석 대장에 기록 (다음 가져오기에서 다시 만들지 않음,
+            # 취소·실패하면 기록하지 않아 다음 가져오기에서 다시 찾음)
+            ledger = get_default_ledger()
+            job_manager.submit(owner, bundle_name, len(missing_jobs),
+                               bundle_steps(render_jobs(missing_jobs), "zip",
+                                            on_done=lambda jobs=missing_jobs: record_jobs(ledger, jobs)),
+                               bundle_name, "application/zip")
+            st.success(f"빠진 신고서 {len(missing_jobs)}건 생성을 시작했습니다. 아래 '생성 작업' 목록에서 진행 상황을 확인하세요.")
+        elif import_stats is not None:
+            st.info("빠진 신고서가 없습니다.")
+
+# ----------------------------------------------------
+# E. 생성 작업 목록 (진행률 / 취소 / 완료된 결과 내려받기)
+# ----------------------------------------------------
+
+my_jobs = job_manager.jobs(owner)
+jobs_active = any(not job.finished for job in my_jobs)
+
+
+# 진행 중인 작업이 있으면 이 부분만 1초마다 다시 그림 (페이지 전체 재실행 없음)
+@st.fragment(run_every=1 if jobs_active else None)
+def show_jobs():
+    current = job_manager.jobs(owner)
+    if jobs_active and all(job.finished for job in current):
+        # 모두 끝나면 페이지 전체를 한 번 다시 그려 주기적 갱신을 멈춤
+        st.rerun()
+
+    for job in current:
+        col_progress, col_action = st.columns([3, 1])
+        with col_progress:
+            st.progress(job.progress, text=f"[{job.id}] {job.title} — {job.status} ({job.done}/{job.total}건)")
+            if job.error:
+                st.error(job.error)
+        with col_action:
+            if not job.finished:
+                if st.button("취소", key=f"cancel_{job.id}", use_container_width=True):
+                    job_manager.cancel(job.id)
+                    st.rerun()
+            else:
+                if job.status == DONE:
+                    # 결과 파일은 누를 때만 읽음 (1초마다 다시 그릴 때 묶음 전체를 메모리로 읽지 않도록)
+                    st.download_button("📥 다운로드", data=job.result_bytes, file_name=job.file_name,
+                                       mime=job.mime, key=f"download_{job.id}", use_container_width=True)
+                if st.button("지우기", key=f"remove_{job.id}", use_container_width=True):
+                    job_manager.remove(job.id)
+                    st.rerun()
+
+
+if my_jobs:
+    st.markdown("---")
+    st.subheader("⏳ 생성 작업")
+    show_jobs()
+
+page_span.end()
@@ -0,0 +1,395 @@
+import argparse
+import sys
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import date, timedelta
+
+from batch import (ENGINES, add_variant_arguments, build_job, generate_reports, print_generated, variant_from_args,
+                   write_bundle_jobs)
+from ledger import LEDGER_PATH, AbsenceLedger
+from roster import ROSTER_PATH, find_roster, student_id
+from school_calendar import load_calendar
+
+# ----------------------------------------------------
+# 출결 시스템 내보내기 파일 → 아직 만들지 않은 결석 신고서 일괄 생성 (메일 머지)
+#
+#   python attendance.py 출결내보내기.csv --roster students.csv -o reports
+#   python attendance.py 출결내보내기.xlsx --bundle zip -o reports
+#   python attendance.py 출결내보내기.csv --dry-run          (빠진 신고서 목록만 출력)
+#
+# 내보내기 파일은 결석한 날 하루가 한 행입니다.
+#   열: 날짜, 출결 구분 + (학번 또는 학년·반·번호) [+ 이름, 사유]
+#   열 이름은 흔히 쓰는 이름 몇 가지를 알아봅니다 (COLUMN_ALIASES).
+#   출결 구분은 질병/인정(출석인정)/기타 결석만 쓰고, 미인정 결석·지각·조퇴·결과는 건너뜁니다.
+#   구분에 '보건'이 들어 있는 인정결석만 보건결석(학부모 의견서 첨부)으로 만들고, 경조사 등
+#   나머지 인정결석은 의견서 없이 만듭니다.
+#
+# 파일은 CHUNK_ROWS 행씩 읽어 명단과 합친 뒤, 학생·결석 종류별로 이어진 등교일을 한 기간으로
+# 묶습니다. 조각 사이에 걸친 기간도 이어 붙이며, 행 대신 기간만 남기므로 1년치(수만 행)
+# 파일도 메모리를 거의 쓰지 않습니다. 결석 대장에 이미 기록된(신고서를 만든) 날은 기간에서
+# 빼고, 남은 등교일(이어진 구간마다 한 건)의 신고서만 결석 종류·기간을 채워 생성한 뒤 대장에 기록합니다.
+#
+# 설정 (환경 변수):
+#   ROSTER_PATH  학생 명단 파일 (기본: students.csv, 없으면 내보내기 파일의 이름 열 사용)
+# ----------------------------------------------------
+
+CHUNK_ROWS = 5000
+
+# 표준 열 이름: 내보내기 파일에서 찾아볼 열 이름 (공백 무시, 앞에 있는 것 우선)
+COLUMN_ALIASES = {
+    "학번": ("학번",),
+    "학년": ("학년",),
+    "반": ("반",),
+    "번호": ("번호", "출석번호"),
+    "이름": ("이름", "성명", "학생명"),
+    "날짜": ("날짜", "일자", "결석일", "출결일자"),
+    "구분": ("출결구분", "구분", "결석구분", "결석_종류", "결석종류"),
+    "사유": ("사유", "결석사유", "출결사유", "비고"),
+}
+
+# 출결 구분 → 신고서의 결석 종류 (미인정을 먼저 걸러야 '인정'과 헷갈리지 않음)
+# '보건'은 신고서에서 의견서를 첨부한 인정결석이 되며, 다른 인정결석과 따로 기간을 묶음
+SKIPPED_KINDS = ("미인정", "무단", "지각", "조퇴", "결과")
+HEALTH_KIND = "보건"
+ABSENCE_KINDS = ((HEALTH_KIND, HEALTH_KIND), ("질병", "질병"), ("인정", "인정"), ("기타", "기타"))
+
+# 기간 하나: 학번, 결석 종류, 시작일, 종료일, 사유
+Period = namedtuple("Period", ["key", "absence_type", "start", "end", "reason"])
+
+ImportResult = namedtuple("ImportResult", ["jobs", "stats"])
+
+
+def absence_type(kind):
+    """출결 구분 문자열을 '보건'/'질병'/'인정'/'기타'로 바꿉니다. 신고서 대상이 아니면 None."""
+    kind = str(kind).replace(" ", "")
+    if not kind or any(word in kind for word in SKIPPED_KINDS):
+        return None
+    return next((name for word, name in ABSENCE_KINDS if word in kind), None)
+
+
+def _find_columns(columns):
+    normalized = {str(c).replace(" ", "").strip(): c for c in columns}
+    found = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        column = next((normalized[a] for a in aliases if a in normalized), None)
+        if column is not None:
+            found[name] = column
+    missing = [name for name in ("날짜", "구분") if name not in found]
+    if "학번" not in found and not all(name in found for name in ("학년", "반", "번호")):
+        missing.append("학번 (또는 학년·반·번호)")
+    if missing:
+        raise ValueError(f"출결 내보내기 파일에 필요한 열이 없습니다: {', '.join(missing)}")
+    return found
+
+
+# ----------------------------------------------------
+# 조각 단위 읽기
+# ----------------------------------------------------
+
+def iter_export_chunks(path, chunk_rows=CHUNK_ROWS, encoding='utf-8-sig'):
+    """내보내기 파일을 chunk_rows 행씩 DataFrame(모든 값 문자열)으로 읽어 돌려줍니다."""
+    import pandas as pd
+
+    if not path.lower().endswith(('.xlsx', '.xlsm')):
+        yield from pd.read_csv(path, dtype=str, encoding=encoding, chunksize=chunk_rows, keep_default_na=False)
+        return
+
+    # read_excel에는 chunksize가 없으므로 openpyxl read_only로 행을 조금씩 읽음
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [str(v).strip() if v is not None else "" for v in next(rows, ())]
+        width = len(header)
+        batch = []
+        for values in rows:
+            # 날짜 칸은 'YYYY-MM-DD' 문자열로 맞춤 (CSV와 같은 처리)
+            batch.append(["" if v is None else v.isoformat()[:10] if isinstance(v, date) else str(v)
+                          for v in values[:width]])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def _parse_dates(values):
+    """'2025-03-03', '2025.03.03.', '2025/3/3', '20250303' 형식을 날짜로 (읽지 못하면 NaT)."""
+    import pandas as pd
+
+    text = values.str.strip().str.rstrip('.').str.replace(r"[./]", "-", regex=True)
+    text = text.where(~text.str.fullmatch(r"\d{8}"), text.str[:4] + "-" + text.str[4:6] + "-" + text.str[6:])
+    return pd.to_datetime(text, format="%Y-%m-%d", errors='coerce')
+
+
+def _roster_frame(roster):
+    import pandas as pd
+
+    return pd.DataFrame(
+        [(key, s['학년'], s['반'], s['번호'], s['이름'], student_id(s['학년'], s['반'], s['번호']))
+         for key, s in roster.students.items()],
+        columns=["학번", "학년", "반", "번호", "이름", "기본학번"])
+
+
+def chunk_periods(df, roster_df, calendar, stats):
+    """조각 하나를 명단과 합치고, 학생·종류별로 이어진 등교일을 기간으로 묶어 Period 목록으로 반환합니다."""
+    import pandas as pd
+
+    columns = _find_columns(df.columns)
+    stats["rows"] += len(df)
+
+    chunk = pd.DataFrame({"구분": df[columns["구분"]].map(absence_type)})
+    chunk["날짜"] = _parse_dates(df[columns["날짜"]].astype(str))
+    chunk["사유"] = df[columns["사유"]].str.strip() if "사유" in columns else ""
+    if "학번" in columns:
+        chunk["학번"] = df[columns["학번"]].str.strip()
+    else:
+        numbers = {name: pd.to_numeric(df[columns[name]], errors='coerce') for name in ("학년", "반", "번호")}
+        valid = numbers["학년"].notna() & numbers["반"].notna() & numbers["번호"].notna()
+        chunk["학번"] = [student_id(int(g), int(c), int(n)) if ok else ""
+                        for g, c, n, ok in zip(numbers["학년"], numbers["반"], numbers["번호"], valid)]
+
+    skipped = chunk["구분"].isna()
+    stats["skipped_kind"] += int(skipped.sum())
+    bad_date = ~skipped & chunk["날짜"].isna()
+    stats["bad_date"] += int(bad_date.sum())
+    chunk = chunk[~skipped & ~bad_date]
+
+    # 명단과 합치기 (명단에 없는 학생 = 전출 등은 따로 셈)
+    if roster_df is not None:
+        if "학번" in columns:
+            joined = chunk.merge(roster_df[["학번"]], on="학번", how="inner")
+        else:
+            # 학년·반·번호로 찾아 명단의 학번으로 바꿈 (명단에 학번 열이 따로 있어도 같은 학생으로 기록)
+            joined = (chunk.rename(columns={"학번": "기본학번"})
+                      .merge(roster_df[["학번", "기본학번"]], on="기본학번", how="inner")
+                      .drop(columns="기본학번"))
+        stats["unknown_student"] += len(chunk) - len(joined)
+        chunk = joined
+    if chunk.empty:
+        return []
+
+    chunk = chunk.sort_values(["학번", "구분", "날짜"]).drop_duplicates(["학번", "구분", "날짜"])
+    days = chunk["날짜"].dt.date.to_numpy()
+    keys = chunk["학번"].to_numpy()
+    kinds = chunk["구분"].to_numpy()
+
+    # 바로 앞 행과 같은 학생·종류이고 두 날짜 사이에 등교일이 없으면 같은 기간
+    same = (keys[1:] == keys[:-1]) & (kinds[1:] == kinds[:-1])
+    gaps = calendar.school_days_array(days[:-1] + timedelta(days=1), days[1:] - timedelta(days=1))
+    new_period = [True] + list(~same | (gaps > 0))
+    chunk["기간"] = pd.Series(new_period, index=chunk.index).cumsum()
+
+    # 기간의 사유는 비어 있지 않은 첫 사유 ('first'는 빈 값(NA)을 건너뜀)
+    chunk["사유"] = chunk["사유"].replace("", None)
+    grouped = chunk.groupby("기간", sort=False).agg(
+        학번=("학번", "first"), 구분=("구분", "first"), 시작일=("날짜", "min"), 종료일=("날짜", "max"),
+        사유=("사유", "first")).fillna({"사유": ""})
+    return [Period(key, kind, start.date(), end.date(), reason)
+            for key, kind, start, end, reason in grouped.itertuples(index=False)]
+
+
+class PeriodMerger:
+    """조각마다 나온 기간을 학생·종류별로 모으며, 등교일로 이어지는 기간은 하나로 합칩니다."""
+
+    def __init__(self, calendar):
+        self.calendar = calendar
+        # {(학번, 종류): 시작일 순으로 정렬된 [시작일, 종료일, 사유] 목록}
+        self._periods = {}
+
+    def _adjacent(self, end, start):
+        return start <= end + timedelta(days=1) or self.calendar.school_days(
+            end + timedelta(days=1), start - timedelta(days=1)) == 0
+
+    def add(self, period):
+        spans = self._periods.setdefault((period.key, period.absence_type), [])
+        entry = [period.start, period.end, period.reason]
+        i = bisect_left(spans, entry)
+        # 앞 기간과 이어지면 합침
+        if i > 0 and self._adjacent(spans[i - 1][1], entry[0]):
+            i -= 1
+            previous = spans.pop(i)
+            entry = [previous[0], max(previous[1], entry[1]), previous[2] or entry[2]]
+        # 뒤 기간들과 이어지면 합침
+        while i < len(spans) and self._adjacent(entry[1], spans[i][0]):
+            following = spans.pop(i)
+            entry = [entry[0], max(entry[1], following[1]), entry[2] or following[2]]
+        spans.insert(i, entry)
+
+    def __iter__(self):
+        for (key, kind), spans in self._periods.items():
+            for start, end, reason in spans:
+                yield Period(key, kind, start, end, reason)
+
+    def __len__(self):
+        return sum(len(spans) for spans in self._periods.values())
+
+
+# ----------------------------------------------------
+# 빠진 신고서 찾기
+# ----------------------------------------------------
+
+def uncovered(period, covered, calendar):
+    """기간에서 covered((시작일, 종료일) 목록)가 덮은 날을 빼고 남은 구간을 Period 목록으로 반환합니다.
+
+    남은 구간은 앞뒤의 쉬는 날을 잘라 내고, 등교일이 하루도 없는 구간은 버립니다.
+    """
+    pieces = []
+    start = period.start
+    for covered_start, covered_end in sorted(covered) + [(period.end + timedelta(days=1), None)]:
+        end = min(covered_start - timedelta(days=1), period.end)
+        if start <= end and calendar.school_days(start, end):
+            while not calendar.school_days(start, start):
+                start += timedelta(days=1)
+            while not calendar.school_days(end, end):
+                end -= timedelta(days=1)
+            pieces.append(period._replace(start=start, end=end))
+        if covered_end is not None:
+            start = max(start, covered_end + timedelta(days=1))
+    return pieces
+
+
+def find_missing(path, roster=None, ledger=None, chunk_rows=CHUNK_ROWS, encoding='utf-8-sig'):
+    """내보내기 파일에서 결석 대장에 없는 결석 기간을 찾아 render_report 인자(작업) 목록으로 반환합니다.
+
+    roster가 없으면 내보내기 파일의 학년·반·번호·이름 열을 그대로 씁니다.
+    작업은 학년·반·번호·시작일 순이고, 신고일은 비워 두어 생성하는 날짜로 찍힙니다.
+    """
+    calendar = load_calendar()
+    roster_df = _roster_frame(roster) if roster is not None else None
+    stats = {"rows": 0, "skipped_kind": 0, "bad_date": 0, "unknown_student": 0,
+             "periods": 0, "existing": 0, "partial": 0, "missing": 0}
+    merger = PeriodMerger(calendar)
+    # 명단이 없을 때 쓸 학생 정보 (학번별 한 줄만 보관)
+    export_students = {}
+
+    for df in iter_export_chunks(path, chunk_rows, encoding):
+        if roster is None:
+            _collect_students(df, export_students)
+        for period in chunk_periods(df, roster_df, calendar, stats):
+            merger.add(period)
+    stats["periods"] = len(merger)
+
+    students = roster.students if roster is not None else export_students
+    jobs = []
+    for period in merger:
+        student = students.get(period.key)
+        if student is None:
+            stats["unknown_student"] += 1
+            continue
+        pieces = [period]
+        if ledger is not None:
+            # 대장에 있는 결석(종류 무관)과 겹치는 날은 빼고 남은 구간만 만듦
+            covered = [(date.fromisoformat(start), date.fromisoformat(end))
+                       for _, start, end in ledger.overlapping(period.key, period.start, period.end)]
+            if covered:
+                pieces = uncovered(period, covered, calendar)
+                stats["existing" if not pieces else "partial"] += 1
+        health = period.absence_type == HEALTH_KIND
+        for piece in pieces:
+            # 의견서를 적어 두지 않으면 build_job이 인정결석을 모두 보건결석으로 봄
+            job = build_job({
+                "학년": student["학년"], "반": student["반"], "번호": student["번호"], "이름": student["이름"],
+                "시작일": piece.start.isoformat(), "종료일": piece.end.isoformat(),
+                "사유": piece.reason, "결석_종류": "인정" if health else piece.absence_type,
+                "의견서": "1" if health else "0",
+            })
+            job["key"] = piece.key
+            jobs.append(job)
+
+    jobs.sort(key=lambda job: (job['data']['학년'], job['data']['반'], job['data']['번호'], job['data']['시작일']))
+    stats["missing"] = len(jobs)
+    return ImportResult(jobs, stats)
+
+
+def _collect_students(df, students):
+    import pandas as pd
+
+    columns = _find_columns(df.columns)
+    if not all(name in columns for name in ("학년", "반", "번호", "이름")):
+        raise ValueError("명단 파일이 없으면 내보내기 파일에 학년·반·번호·이름 열이 있어야 합니다")
+    numbers = {name: pd.to_numeric(df[columns[name]], errors='coerce') for name in ("학년", "반", "번호")}
+    keys = df[columns["학번"]].str.strip() if "학번" in columns else None
+    for i, (g, c, n, name) in enumerate(zip(numbers["학년"], numbers["반"], numbers["번호"], df[columns["이름"]])):
+        if pd.isna(g) or pd.isna(c) or pd.isna(n):
+            continue
+        key = keys.iat[i] if keys is not None else student_id(int(g), int(c), int(n))
+        if key not in students:
+            students[key] = {"학년": int(g), "반": int(c), "번호": int(n), "이름": str(name).strip()}
+
+
+def record_jobs(ledger, jobs, batch_size=1000):
+    """생성한 신고서를 결석 대장에 기록합니다 (batch_size건씩 한 트랜잭션)."""
+    for i in range(0, len(jobs), batch_size):
+        ledger.record_many([(job['data'], job['has_diagnosis'], job['has_opinion'], job['etc_doc_val'],
+                             job['key'], job['issue_date']) for job in jobs[i:i + batch_size]])
+
+
+def render_jobs(jobs):
+    """작업 목록에서 render_report 인자만 남깁니다 (학번 키 제외)."""
+    return [{name: value for name, value in job.items() if name != 'key'} for job in jobs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="출결 시스템 내보내기 파일로 빠진 결석 신고서 일괄 생성")
+    parser.add_argument("input", help="출결 내보내기 파일 (.csv 또는 .xlsx)")
+    parser.add_argument("--roster", default=ROSTER_PATH, help=f"학생 명단 파일 (기본: {ROSTER_PATH})")
+    parser.add_argument("-o", "--out-dir", default="reports", help="신고서 저장 폴더 (기본: reports)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="template",
+                        help="생성 방식 (기본: template, 보관용 작은 파일은 compact)")
+    parser.add_argument("--bundle", choices=["zip", "workbook"], default=None,
+                        help="개별 파일 대신 ZIP 묶음 또는 학생별 시트 통합 문서 하나로 저장")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV 문자 인코딩 (기본: utf-8-sig, 예: cp949)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"한 번에 읽을 행 수 (기본: {CHUNK_ROWS})")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help=f"결석 대장 SQLite 파일 (기본: {LEDGER_PATH})")
+    parser.add_argument("--no-ledger", action="store_true", help="결석 대장과 비교하지 않고 모든 기간을 생성")
+    parser.add_argument("--dry-run", action="store_true", help="생성하지 않고 빠진 신고서 목록만 출력")
+    add_variant_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.bundle == "workbook" and args.engine != "template":
+        parser.error("--bundle workbook은 --engine template로만 만들 수 있습니다")
+
+    roster = find_roster(args.roster)
+    if roster is None:
+        print(f"명단 파일({args.roster})이 없어 내보내기 파일의 학생 정보를 사용합니다.", file=sys.stderr)
+    ledger = None if args.no_ledger else AbsenceLedger(args.ledger)
+
+    started = time.perf_counter()
+    jobs, stats = find_missing(args.input, roster, ledger, args.chunk_rows, args.encoding)
+    print(f"{stats['rows']}행 → 결석 기간 {stats['periods']}건 (신고서 있음 {stats['existing']}건, "
+          f"일부만 있음 {stats['partial']}건, 빠진 신고서 {stats['missing']}건) "
+          f"| 건너뜀: 대상 아닌 구분 {stats['skipped_kind']}행, 날짜 오류 {stats['bad_date']}행, "
+          f"명단에 없는 학생 {stats['unknown_student']}행 ({time.perf_counter() - started:.2f}초)")
+
+    if args.dry_run:
+        for job in jobs:
+            data = job['data']
+            print(f"{data['학년']}-{data['반']}-{data['번호']} {data['이름']}\t{data['결석_종류']}\t"
+                  f"{data['시작일']} ~ {data['종료일']} ({data['총_일수']}일)\t{data['사유']}")
+        return 0
+    if not jobs:
+        return 0
+
+    failed = 0
+    if args.bundle:
+        write_bundle_jobs(render_jobs(jobs), args.out_dir, args.bundle, args.engine, variant_from_args(args))
+    else:
+        started = time.perf_counter()
+        results = generate_reports(render_jobs(jobs), args.out_dir, workers=args.workers, engine=args.engine,
+                                   variant=variant_from_args(args))
+        failed = print_generated(jobs, results, args.out_dir, time.perf_counter() - started)
+        # 만들지 못한 신고서는 대장에 남기지 않아 다음 가져오기에서 다시 찾음
+        jobs = [job for job, result in zip(jobs, results) if result.error is None]
+
+    if ledger is not None:
+        record_jobs(ledger, jobs)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# ----------------------------------------------------
+# 백그라운드 신고서 생성 (Streamlit 재실행과 무관하게 유지되는 작업 풀)
+#
+# 작업(Job)은 "몇 건 완료했는지"를 yield하고 마지막에 결과를 return하는 제너레이터입니다.
+# 작업 스레드는 작업을 잠깐(SLICE_SECONDS)씩만 실행하고 다시 줄에 세우며,
+# 줄은 요청한 사람(owner, 예: 교사의 브라우저 세션)별로 돌아가며 처리합니다.
+# 따라서 한 사람이 큰 묶음을 맡겨도 다른 사람의 신고서 한 건이 오래 기다리지 않습니다.
+#
+# 설정 (환경 변수):
+#   JOB_WORKERS       작업 스레드 수 (기본: 2)
+#   JOB_KEEP_MINUTES  끝난 작업 결과를 보관하는 시간 (기본: 60)
+# ----------------------------------------------------
+
+SLICE_SECONDS = 0.05
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = "대기", "생성 중", "완료", "취소됨", "실패"
+
+
+class Job:
+    """작업 한 개의 진행 상태와 결과 (bytes 또는 열린 임시 파일)."""
+
+    def __init__(self, owner, title, total, steps, file_name=None, mime=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.owner = owner
+        self.title = title
+        self.total = total
+        self.file_name = file_name
+        self.mime = mime
+        self.done = 0
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._steps = steps
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def progress(self):
+        if self.status == DONE:
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """작업이 끝날 때까지 최대 timeout초 기다리고, 끝났는지 반환합니다."""
+        return self._finished.wait(timeout)
+
+    def result_bytes(self):
+        if hasattr(self.result, 'read'):
+            self.result.seek(0)
+            return self.result.read()
+        return self.result
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self._finished.set()
+
+    def _discard(self):
+        if hasattr(self.result, 'close'):
+            self.result.close()
+        self.result = None
+
+
+class JobManager:
+    """요청한 사람별로 돌아가며(round-robin) 작업을 조금씩 실행하는 스레드 풀."""
+
+    def __init__(self, workers=2, keep_seconds=3600, slice_seconds=SLICE_SECONDS):
+        self.keep_seconds = keep_seconds
+        self.slice_seconds = slice_seconds
+        self._cond = threading.Condition()
+        self._jobs = {}
+        # {owner: deque[Job]} — 맨 앞 owner의 맨 앞 작업부터 실행하고, 실행한 owner는 맨 뒤로 보냄
+        self._queues = OrderedDict()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f'report-job-{i}', daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # --- 공개 API ---
+
+    def submit(self, owner, title, total, steps, file_name=None, mime=None):
+        job = Job(owner, title, total, steps, file_name, mime)
+        with self._cond:
+            self._purge()
+            self._jobs[job.id] = job
+            self._queues.setdefault(owner, deque()).append(job)
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner):
+        with self._cond:
+            return sorted((job for job in self._jobs.values() if job.owner == owner), key=lambda job: job.created_at)
+
+    def cancel(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return
+            job._cancel.set()
+            # 아직 줄에 있으면 바로 취소, 실행 중이면 작업 스레드가 현재 조각을 마치고 정리함
+            queue = self._queues.get(job.owner)
+            if queue is not None and job in queue:
+                queue.remove(job)
+                if not queue:
+                    del self._queues[job.owner]
+                job._steps.close()
+                job._finish(CANCELLED)
+
+    def remove(self, job_id):
+        """끝난 작업을 목록에서 지우고 결과를 버립니다 (진행 중이면 먼저 취소)."""
+        self.cancel(job_id)
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+                job._discard()
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    # --- 작업 스레드 ---
+
+    def _purge(self):
+        limit = time.time() - self.keep_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < limit]:
+            self._jobs.pop(job_id)._discard()
+
+    def _take(self):
+        with self._cond:
+            while not self._queues and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            owner, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            del self._queues[owner]
+            if queue:
+                self._queues[owner] = queue
+            job.status = RUNNING
+            return job
+
+    def _requeue(self, job):
+        with self._cond:
+            queue = self._queues.pop(job.owner, None) or deque()
+            queue.appendleft(job)
+            self._queues[job.owner] = queue
+            self._cond.notify()
+
+    def _work(self):
+        while True:
+            job = self._take()
+            if job is None:
+                return
+            deadline = time.perf_counter() + self.slice_seconds
+            try:
+                while not job._cancel.is_set() and time.perf_counter() < deadline:
+                    job.done = next(job._steps)
+            except StopIteration as stop:
+                job._finish(DONE, result=stop.value)
+                continue
+            except Exception as e:
+                job._finish(FAILED, error=str(e))
+                continue
+
+            if job._cancel.is_set():
+                job._steps.close()
+                job._finish(CANCELLED)
+            else:
+                self._requeue(job)
+
+
+# ----------------------------------------------------
+# 작업 내용 (제너레이터)
+# ----------------------------------------------------
+
+def report_steps(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None, on_done=None):
+    """신고서 한 건 (결과: .xlsx bytes). on_done은 신고서를 다 만든 뒤에만 불립니다."""
+    from report_cache import render_report_cached
+
+    excel_bytes = render_report_cached(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date)
+    if on_done is not None:
+        on_done()
+    yield 1
+    return excel_bytes
+
+
+def bundle_steps(jobs, kind, on_done=None):
+    """신고서 여러 건을 ZIP 묶음(kind='zip') 또는 학생별 시트 통합 문서로 (결과: 임시 파일).
+
+    on_done은 마지막 조각까지 기록한 뒤에만 불립니다 (취소·실패한 묶음은 결석 대장에 남기지 않도록).
+    """
+    from bundle import iter_workbook_bundle, iter_zip_bundle
+
+    counter = [0]
+
+    def counted():
+        for job in jobs:
+            counter[0] += 1
+            yield job
+
+    iter_bundle = iter_zip_bundle if kind == "zip" else iter_workbook_bundle
+    out = tempfile.TemporaryFile()
+    try:
+        for chunk in iter_bundle(counted()):
+            out.write(chunk)
+            yield counter[0]
+    except BaseException:
+        # 취소(GeneratorExit)·오류 시 임시 파일 정리
+        out.close()
+        raise
+    if on_done is not None:
+        on_done()
+    out.seek(0)
+    return out
+
+
+_default_manager = None
+_default_lock = threading.Lock()
+
+
+def get_default_manager():
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = JobManager(
+                workers=int(os.environ.get("JOB_WORKERS", "2")),
+                keep_seconds=int(os.environ.get("JOB_KEEP_MINUTES", "60")) * 60,
+            )
+    return _default_manager
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+
+from ledger import LEDGER_PATH, AbsenceLedger
+from report import DEFAULT_VARIANT, FormVariant, render_report, report_file_name
+from roster import ROSTER_PATH, find_roster, student_key, student_label
+from school_calendar import calculate_days
+from xlsx_template import render_report_compact, render_report_fast
+
+# ----------------------------------------------------
+# 결석 신고서 일괄 생성 (명령줄 실행, Streamlit 불필요)
+#
+#   python batch.py 결석목록.csv -o 출력폴더
+#   python batch.py 결석목록.csv -o 출력폴더 --bundle zip       (ZIP 하나로 묶기)
+#   python batch.py 결석목록.csv -o 출력폴더 --bundle workbook  (시트별 통합 문서)
+#   python batch.py 결석목록.csv -o 출력폴더 --engine compact   (보관용 작은 파일)
+#   python batch.py 결석목록.csv -o 출력폴더 --school 한빛고등학교 --no-opinion  (양식 변형)
+#
+# 입력 CSV 열: 학년, 반, 번호, 이름, 시작일, 종료일, 사유, 결석_종류
+# 선택 열:     진단서, 의견서, 기타서류, 증상, 부모님_의견, 신고일
+# ----------------------------------------------------
+
+# 생성 방식: template(고속, 기본) / compact(압축 출력, 보관·메일용) / openpyxl(기존 방식)
+# (--bundle zip은 모든 방식, --bundle workbook은 시트 XML을 옮겨 담으므로 template만)
+ENGINES = {
+    'template': render_report_fast,
+    'compact': render_report_compact,
+    'openpyxl': render_report,
+}
+
+# 신고서 한 건의 생성 결과: 저장한 경로 또는 (실패하면) 오류 메시지
+Generated = namedtuple("Generated", ["path", "error"])
+
+TRUE_VALUES = {'1', 'y', 'yes', 'true', 'x', 'o', '예', '있음'}
+
+
+def parse_flag(value):
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_date(value):
+    return date.fromisoformat(str(value).strip())
+
+
+def add_variant_arguments(parser):
+    """양식 변형(report.FormVariant) 선택 옵션을 명령줄에 더합니다."""
+    parser.add_argument("--school", default=DEFAULT_VARIANT.school_name,
+                        help=f"양식에 찍을 학교 이름 (기본: {DEFAULT_VARIANT.school_name}, SCHOOL_NAME)")
+    parser.add_argument("--year", type=int, default=None, help="날짜에 찍을 연도 (기본: 각 날짜의 연도)")
+    parser.add_argument("--no-opinion", action="store_true", help="2페이지 보호자 의견서 구역을 뺀 양식")
+
+
+def variant_from_args(args):
+    """add_variant_arguments() 옵션으로 FormVariant를 만듭니다 (기본 양식이면 None)."""
+    variant = FormVariant(args.school, args.year, not args.no_opinion)
+    return None if variant == DEFAULT_VARIANT else variant
+
+
+def build_job(row):
+    """CSV 한 행을 render_report 인자(딕셔너리)로 변환합니다. 화면(app.py)의 기본값 규칙을 그대로 따릅니다."""
+    start_date = parse_date(row['시작일'])
+    end_date = parse_date(row['종료일'])
+    total_days = calculate_days(start_date, end_date)
+    absence_type = row.get('결석_종류') or '질병'
+
+    final_data = {
+        "학년": int(row['학년']), "반": int(row['반']), "번호": int(row['번호']),
+        "이름": row['이름'].strip(), "총_일수": total_days,
+        "시작일": start_date, "종료일": end_date,
+        "사유": row.get('사유') or '', "결석_종류": absence_type
+    }
+
+    # 첨부 서류 열이 비어 있으면 화면의 체크박스 기본값과 동일하게 판단
+    if row.get('진단서'):
+        has_diagnosis = parse_flag(row['진단서'])
+    else:
+        has_diagnosis = total_days >= 3 and absence_type == '질병'
+    if row.get('의견서'):
+        has_opinion = parse_flag(row['의견서'])
+    else:
+        has_opinion = absence_type == '인정'
+
+    return {
+        "data": final_data,
+        "has_diagnosis": has_diagnosis,
+        "has_opinion": has_opinion,
+        "etc_doc_val": row.get('기타서류') or '',
+        "symptom": (row.get('증상') or '') if absence_type == '인정' else '',
+        "parent_opinion": (row.get('부모님_의견') or '') if absence_type == '인정' else '',
+        "issue_date": parse_date(row['신고일']) if row.get('신고일') else None,
+    }
+
+
+def iter_jobs(f):
+    """열린 CSV 파일에서 한 행씩 작업을 만들어 돌려줍니다 (전체를 메모리에 올리지 않음)."""
+    for row in csv.DictReader(f):
+        yield build_job(row)
+
+
+def read_jobs(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(iter_jobs(f))
+
+
+def checked_jobs(ledger, jobs, roster=None):
+    """작업마다 결석 대장으로 규정·기간 중복을 확인해 안내를 출력하고 돌려줍니다.
+
+    돌려준 작업은 받은 쪽이 다음 작업을 요청할 때(= 신고서를 다 만든 뒤) 대장에 기록하므로,
+    만들다 실패해 멈춘 작업은 남지 않습니다. 한 건씩 기록하므로 같은 입력 파일 안의
+    중복(예: 같은 달 보건결석 2회)도 잡아냅니다. 학번은 명단(roster)에서 찾아
+    화면·attendance.py와 같은 학생으로 기록합니다.
+    """
+    for job in jobs:
+        data = job['data']
+        args = (data, job['has_diagnosis'], job['has_opinion'], job['etc_doc_val'])
+        key = student_key(data, roster)
+        for finding in ledger.check(*args, key=key, issue_date=job['issue_date']):
+            print(f"[{finding.rule}] {student_label(data)} {data['시작일']}: {finding.message}", file=sys.stderr)
+        yield job
+        ledger.record(*args, key=key, issue_date=job['issue_date'])
+
+
+def batch_file_name(data):
+    # 같은 이름/같은 날짜의 학생이 있어도 겹치지 않도록 학번을 앞에 붙임
+    return f"{data['학년']}{data['반']:02d}{data['번호']:02d}_{report_file_name(data)}"
+
+
+def write_report(job, out_dir, engine='template', variant=None):
+    """작업 프로세스에서 실행: 신고서를 만들어 바로 파일로 저장하고 경로만 돌려줍니다."""
+    path = os.path.join(out_dir, batch_file_name(job['data']))
+    # 만들다 실패하면 빈 파일이 남지 않도록 다 만든 뒤에 파일을 엶
+    excel_bytes = ENGINES[engine](**job, variant=variant)
+    with open(path, 'wb') as f:
+        f.write(excel_bytes)
+    return path
+
+
+def _write_report_star(args):
+    try:
+        return Generated(write_report(*args), None)
+    except Exception as e:
+        # 한 건이 실패해도 나머지는 계속 만듦
+        return Generated(None, str(e))
+
+
+def generate_reports(jobs, out_dir, workers=None, chunksize=None, engine='template', variant=None):
+    """jobs 목록을 프로세스 풀에 나누어 신고서 파일을 생성하고, 작업 순서대로 Generated 목록을 반환합니다."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [_write_report_star((job, out_dir, engine, variant)) for job in jobs]
+
+    # 작업 하나가 수 ms 수준이므로 여러 건씩 묶어 프로세스 간 전달 비용을 줄임
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_write_report_star, ((job, out_dir, engine, variant) for job in jobs),
+                             chunksize=chunksize))
+
+
+def print_generated(jobs, results, out_dir, elapsed):
+    """실패한 신고서를 한 줄씩 알리고 생성 결과를 요약해 출력한 뒤, 실패 건수를 반환합니다."""
+    failed = 0
+    for job, result in zip(jobs, results):
+        if result.error is not None:
+            failed += 1
+            data = job['data']
+            print(f"[생성 실패] {student_label(data)} {data['시작일']}: {result.error}", file=sys.stderr)
+    done = len(results) - failed
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"{done}건 생성 완료 → {out_dir} ({elapsed:.2f}초, {rate:.1f} reports/sec)"
+          + (f", 실패 {failed}건" if failed else ""))
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="결석 신고서 Excel 일괄 생성")
+    parser.add_argument("input", help="결석 기록 CSV 파일 (UTF-8)")
+    parser.add_argument("-o", "--out-dir", default="reports", help="신고서 저장 폴더 (기본: reports)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="template", help="생성 방식 (기본: template)")
+    parser.add_argument("--bundle", choices=["zip", "workbook"], default=None,
+                        help="개별 파일 대신 ZIP 묶음 또는 학생별 시트 통합 문서 하나로 저장")
+    parser.add_argument("--chunksize", type=int, default=None, help="프로세스에 한 번에 넘길 작업 수")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help=f"결석 대장 SQLite 파일 (기본: {LEDGER_PATH})")
+    parser.add_argument("--no-ledger", action="store_true", help="결석 대장 확인·기록을 하지 않음")
+    parser.add_argument("--roster", default=ROSTER_PATH, help=f"결석 대장 학번을 찾을 학생 명단 파일 (기본: {ROSTER_PATH})")
+    add_variant_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.bundle == "workbook" and args.engine != "template":
+        parser.error("--bundle workbook은 --engine template로만 만들 수 있습니다")
+    variant = variant_from_args(args)
+
+    ledger = None if args.no_ledger else AbsenceLedger(args.ledger)
+    roster = find_roster(args.roster) if ledger is not None else None
+
+    if args.bundle:
+        return write_bundle_file(args.input, args.out_dir, args.bundle, ledger, roster, args.engine, variant)
+
+    jobs = read_jobs(args.input)
+
+    started = time.perf_counter()
+    results = generate_reports(jobs, args.out_dir, workers=args.workers, chunksize=args.chunksize,
+                               engine=args.engine, variant=variant)
+    failed = print_generated(jobs, results, args.out_dir, time.perf_counter() - started)
+    if ledger is not None:
+        # 만든 신고서만 확인·기록 (프로세스 풀로 한꺼번에 만들므로 확인 안내는 생성 뒤에 출력)
+        for _ in checked_jobs(ledger, [job for job, result in zip(jobs, results) if result.error is None], roster):
+            pass
+    return 1 if failed else 0
+
+
+def write_bundle_file(input_path, out_dir, kind, ledger=None, roster=None, engine='template', variant=None):
+    """입력 CSV를 한 행씩 읽으며 묶음 파일 하나로 곧바로 기록합니다."""
+    with open(input_path, newline='', encoding='utf-8-sig') as f:
+        jobs = iter_jobs(f)
+        if ledger is not None:
+            jobs = checked_jobs(ledger, jobs, roster)
+        write_bundle_jobs(jobs, out_dir, kind, engine, variant)
+    return 0
+
+
+def write_bundle_jobs(jobs, out_dir, kind, engine='template', variant=None):
+    """작업(iterable)을 하나씩 생성하며 묶음 파일 하나로 곧바로 기록하고 경로를 반환합니다.
+
+    ZIP 묶음의 파일은 engine 방식으로 만들고, 통합 문서(kind='workbook')는 template 방식만 됩니다.
+    """
+    from bundle import iter_workbook_bundle, iter_zip_bundle
+
+    os.makedirs(out_dir, exist_ok=True)
+    counter = {"n": 0}
+
+    def counted(jobs):
+        for job in jobs:
+            counter["n"] += 1
+            yield job
+
+    if kind == "zip":
+        iter_bundle, ext = partial(iter_zip_bundle, engine=engine, variant=variant), "zip"
+    elif engine == "template":
+        iter_bundle, ext = partial(iter_workbook_bundle, variant=variant), "xlsx"
+    else:
+        raise ValueError(f"통합 문서 묶음은 template 방식만 됩니다 (engine={engine})")
+    path = os.path.join(out_dir, f"결석신고서_묶음.{ext}")
+
+    started = time.perf_counter()
+    with open(path, 'wb') as out:
+        for chunk in iter_bundle(counted(jobs)):
+            out.write(chunk)
+    elapsed = time.perf_counter() - started
+
+    rate = counter["n"] / elapsed if elapsed > 0 else 0.0
+    print(f"{counter['n']}건 묶음 생성 완료 → {path} ({elapsed:.2f}초, {rate:.1f} reports/sec)")
+    return path
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,349 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from io import BytesIO
+
+# ----------------------------------------------------
+# 신고서 생성 성능 측정 (Streamlit 불필요)
+#
+#   python benchmark.py                                   (측정 → benchmark_results.json)
+#   python benchmark.py --baseline benchmark_baseline.json (기준값과 비교, 느려지면 종료 코드 1)
+#   python benchmark.py --save-baseline                   (이번 결과를 기준값으로 저장)
+#
+# 생성 방식마다 다음을 잽니다.
+#   cold        새 프로세스에서 import + 첫 신고서 (양식 준비 포함)
+#   warm        반복 생성한 신고서 한 건의 중앙값/p95 — build(값·통합 문서 구성)와 save(.xlsx 직렬화) 분리
+#   throughput  1 / 100 / 1,000건 연속 생성 시 초당 건수
+#   peak_kb     신고서 한 건을 만드는 동안의 tracemalloc 최대 메모리
+#   size_bytes  만들어진 .xlsx 파일 한 건의 크기
+#
+# 이어서 template / compact 방식의 ZIP 압축 수준(--levels, 기본 0 1 6 9)마다
+# 파일 크기와 save 시간의 중앙값을 표로 보여 줍니다 (결과 JSON의 "compression").
+# ----------------------------------------------------
+
+RESULTS_PATH = "benchmark_results.json"
+BASELINE_PATH = "benchmark_baseline.json"
+
+BATCH_SIZES = (1, 100, 1000)
+COMPRESSION_LEVELS = (0, 1, 6, 9)
+
+# 기준값 비교 항목: (이름, 값을 꺼내는 함수, 클수록 좋은지)
+METRICS = (
+    ("cold.total_ms", lambda r: r["cold"]["total_ms"], False),
+    ("warm.total_ms", lambda r: r["warm"]["total_ms"]["median"], False),
+    ("peak_kb", lambda r: r["peak_kb"], False),
+    ("size_bytes", lambda r: r["size_bytes"], False),
+) + tuple(
+    (f"throughput.{n}", lambda r, n=n: r["throughput"][str(n)], True) for n in BATCH_SIZES
+)
+
+
+# ----------------------------------------------------
+# 생성 방식: 각 함수는 인자(job)를 받아 (build 결과, save 함수)로 나눔
+# ----------------------------------------------------
+
+def _openpyxl_engine():
+    from report import create_excel_report
+
+    def build(job):
+        return create_excel_report(**job)
+
+    def save(wb):
+        buffer = BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue()
+    return build, save
+
+
+def _template_engine():
+    from report import report_values
+    from xlsx_template import get_template
+
+    template = get_template(compact=False)
+
+    def build(job):
+        return report_values(**job)
+    return build, template.render_values
+
+
+def _compact_engine():
+    # 최소 테마·기본값 제거·공유 문자열 + 높은 압축 수준 (REPORT_COMPACT_LEVEL)
+    from report import report_values
+    from xlsx_template import get_template
+
+    template = get_template(compact=True)
+
+    def build(job):
+        return report_values(**job)
+    return build, template.render_values
+
+
+def _cached_engine():
+    # 디스크를 쓰지 않는 메모리 캐시 — 같은 내용은 적중, 새 내용은 생성 후 저장
+    from report_cache import ReportCache, render_report_cached
+
+    cache = ReportCache(directory=None)
+
+    def build(job):
+        return job
+
+    def save(job):
+        return render_report_cached(**job, cache=cache)
+    return build, save
+
+
+ENGINES = {
+    'openpyxl': _openpyxl_engine,
+    'template': _template_engine,
+    'compact': _compact_engine,
+    'cached': _cached_engine,
+}
+
+
+def sample_job(i=0):
+    """i번째 측정용 신고서 인자. i가 다르면 학생(학년·반·번호)이 달라 캐시 키도 달라집니다."""
+    grade, rest = divmod(i, 1000)
+    class_no, number = divmod(rest, 40)
+    absence_type = ('질병', '인정', '기타')[i % 3]
+    return {
+        "data": {
+            "학년": grade % 3 + 1, "반": class_no + 1, "번호": number + 1, "이름": "김철수", "총_일수": 3,
+            "시작일": date(2025, 3, 3), "종료일": date(2025, 3, 5),
+            "사유": "독감으로 인한 자가 격리", "결석_종류": absence_type,
+        },
+        "has_diagnosis": absence_type == '질병',
+        "has_opinion": absence_type == '인정',
+        "etc_doc_val": "가족관계증명서" if absence_type == '기타' else "",
+        "symptom": "발열, 두통" if absence_type == '인정' else "",
+        "parent_opinion": "월 1회 보건 결석임을 확인합니다." if absence_type == '인정' else "",
+        "issue_date": date(2025, 3, 6),
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 4)
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {
+        "median": _ms(statistics.median(ordered)),
+        "p95": _ms(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]),
+        "mean": _ms(statistics.fmean(ordered)),
+    }
+
+
+# ----------------------------------------------------
+# 측정
+# ----------------------------------------------------
+
+def measure_cold(engine):
+    """새 파이썬 프로세스에서 import부터 첫 신고서까지 시간을 잽니다."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--cold-probe", engine],
+        check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _cold_probe(engine):
+    started = time.perf_counter()
+    build, save = ENGINES[engine]()
+    prepared = time.perf_counter()
+    built = build(sample_job())
+    build_done = time.perf_counter()
+    save(built)
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_ms": _ms(prepared - started),
+        "build_ms": _ms(build_done - prepared),
+        "save_ms": _ms(done - build_done),
+        "total_ms": _ms(done - started),
+    }))
+
+
+def measure_warm(build, save, repeat):
+    job = sample_job()
+    save(build(job))
+    build_times, save_times, total_times = [], [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        built = build(job)
+        build_done = time.perf_counter()
+        save(built)
+        done = time.perf_counter()
+        build_times.append(build_done - started)
+        save_times.append(done - build_done)
+        total_times.append(done - started)
+    return {"build_ms": _summary(build_times), "save_ms": _summary(save_times), "total_ms": _summary(total_times)}
+
+
+def measure_throughput(build, save, n):
+    jobs = [sample_job(i) for i in range(n)]
+    started = time.perf_counter()
+    for job in jobs:
+        save(build(job))
+    elapsed = time.perf_counter() - started
+    return round(n / elapsed, 2) if elapsed > 0 else 0.0
+
+
+def measure_peak(build, save):
+    job = sample_job()
+    save(build(job))
+    tracemalloc.start()
+    try:
+        save(build(job))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def measure_compression(levels, repeat):
+    """압축 수준별 파일 크기와 save 시간(중앙값)을 일반 / compact 출력 각각에 대해 잽니다."""
+    from report import report_values
+    from xlsx_template import get_template
+
+    values = report_values(**sample_job())
+    results = {}
+    for mode, compact in (('template', False), ('compact', True)):
+        rows = results[mode] = {}
+        for level in levels:
+            template = get_template(compress_level=level, compact=compact)
+            size = len(template.render_values(values))
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                template.render_values(values)
+                samples.append(time.perf_counter() - started)
+            rows[str(level)] = {"size_bytes": size, "save_ms": _ms(statistics.median(samples))}
+    return results
+
+
+def print_compression(compression):
+    levels = list(next(iter(compression.values())))
+    print("압축 수준별 파일 크기 / save 시간")
+    print(f"  {'수준':<4}" + "".join(f"{mode:>24}" for mode in compression))
+    for level in levels:
+        cells = "".join(f"{rows[level]['size_bytes']:>11,} B {rows[level]['save_ms']:>7.3f} ms"
+                        for rows in compression.values())
+        print(f"  {level:<6}{cells}")
+
+
+def run_benchmarks(engines, repeat, levels=COMPRESSION_LEVELS):
+    results = {}
+    for engine in engines:
+        cold = measure_cold(engine)
+        build, save = ENGINES[engine]()
+        results[engine] = {
+            "cold": cold,
+            "warm": measure_warm(build, save, repeat),
+            # 인자가 모두 달라 cached 방식은 여기서 캐시 미스(생성 + 저장) 비용을 보여 줌
+            "throughput": {str(n): measure_throughput(build, save, n) for n in BATCH_SIZES},
+            "peak_kb": measure_peak(build, save),
+            "size_bytes": len(save(build(sample_job()))),
+        }
+        print_result(engine, results[engine])
+    compression = measure_compression(levels, repeat) if levels else {}
+    if compression:
+        print_compression(compression)
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "openpyxl": _openpyxl_version(),
+            "repeat": repeat,
+        },
+        "results": results,
+        "compression": compression,
+    }
+
+
+def _openpyxl_version():
+    import openpyxl
+    return openpyxl.__version__
+
+
+def print_result(engine, result):
+    warm = result["warm"]
+    rates = ", ".join(f"{n}건 {result['throughput'][str(n)]:.0f}/s" for n in BATCH_SIZES)
+    print(f"[{engine}] cold {result['cold']['total_ms']:.1f} ms | "
+          f"warm {warm['total_ms']['median']:.3f} ms (build {warm['build_ms']['median']:.3f} + "
+          f"save {warm['save_ms']['median']:.3f}, p95 {warm['total_ms']['p95']:.3f}) | "
+          f"{rates} | peak {result['peak_kb']:.0f} KB | {result['size_bytes']:,} B")
+
+
+# ----------------------------------------------------
+# 기준값 비교
+# ----------------------------------------------------
+
+def compare_with_baseline(current, baseline, threshold):
+    """threshold(예: 0.25 = 25%)보다 나빠진 항목의 설명 목록을 반환합니다. 기준값에 없는 방식·항목은 건너뜀."""
+    regressions = []
+    for engine, result in current["results"].items():
+        base = baseline.get("results", {}).get(engine)
+        if base is None:
+            continue
+        for name, value_of, higher_is_better in METRICS:
+            try:
+                old, new = value_of(base), value_of(result)
+            except KeyError:
+                continue
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            mark = "!!" if worse > threshold else "  "
+            print(f"{mark} {engine:<9} {name:<18} {old:>12.3f} → {new:>12.3f} ({change:+.1%})")
+            if worse > threshold:
+                regressions.append(f"{engine} {name}: {old} → {new} ({change:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="결석 신고서 생성 성능 측정")
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES),
+                        help="측정할 생성 방식 (여러 번 지정 가능, 기본: 전부)")
+    parser.add_argument("--repeat", type=int, default=100, help="warm 측정 반복 횟수 (기본: 100)")
+    parser.add_argument("--levels", type=int, nargs="*", default=list(COMPRESSION_LEVELS),
+                        help="파일 크기를 비교할 ZIP 압축 수준 0~9 (기본: 0 1 6 9, 값 없이 쓰면 건너뜀)")
+    parser.add_argument("-o", "--output", default=RESULTS_PATH, help=f"결과 JSON 파일 (기본: {RESULTS_PATH})")
+    parser.add_argument("--baseline", default=None, help=f"비교할 기준값 JSON 파일 (예: {BASELINE_PATH})")
+    parser.add_argument("--threshold", type=float, default=0.25, help="허용 성능 저하 비율 (기본: 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help=f"결과를 기준값으로도 저장 (기본 경로: {BASELINE_PATH})")
+    parser.add_argument("--cold-probe", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.cold_probe:
+        _cold_probe(args.cold_probe)
+        return 0
+
+    current = run_benchmarks(args.engine or list(ENGINES), args.repeat, args.levels)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장 → {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(current, baseline, args.threshold)
+        if regressions:
+            print(f"성능 저하 {len(regressions)}건 (허용 {args.threshold:.0%} 초과)")
+            return 1
+        print("기준값 대비 성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+import re
+import time
+
+from batch import ENGINES, batch_file_name
+from report import report_values
+from xlsx_template import ZipPart, ZipStreamWriter, escape_text, get_template
+
+# ----------------------------------------------------
+# 여러 학생의 결석 신고서를 한 번에 내려받기 위한 묶음 생성
+#
+# 1) ZIP 묶음: 학생별 .xlsx 파일을 하나의 ZIP으로
+# 2) 통합 문서: 학생별 '결석신고서' 시트 + 목록(색인) 시트를 가진 .xlsx 하나
+#
+# 두 방식 모두 신고서를 하나씩 만들어 곧바로 바이트 조각으로 내보내므로
+# (제너레이터) 묶음에 들어가는 신고서 수가 늘어도 메모리 사용량은 거의 일정합니다.
+# jobs는 batch.build_job()이 만드는 render_report 인자 딕셔너리의 iterable입니다.
+# ----------------------------------------------------
+
+INDEX_SHEET_TITLE = "목록"
+INDEX_HEADERS = ("연번", "학년", "반", "번호", "이름", "결석 기간", "일수", "결석 종류", "시트")
+INDEX_WIDTHS = (6, 6, 6, 6, 12, 28, 6, 10, 24)
+
+_INVALID_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_WORKSHEET_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+
+
+def _unique(name, used, limit=None):
+    """이미 쓴 이름이면 ' (2)', ' (3)' …을 붙여 겹치지 않게 합니다 (대소문자 무시)."""
+    base = name[:limit] if limit else name
+    candidate = base
+    n = 1
+    while candidate.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        candidate = (base[:limit - len(suffix)] if limit else base) + suffix
+    used.add(candidate.lower())
+    return candidate
+
+
+def _unique_file_name(name, used):
+    stem, dot, ext = name.rpartition('.')
+    if not dot:
+        return _unique(name, used)
+    candidate = name
+    n = 1
+    while candidate.lower() in used:
+        n += 1
+        candidate = f"{stem} ({n}).{ext}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def sheet_title(data):
+    # Excel 시트 이름 규칙: 31자 이내, []:*?/\ 사용 불가
+    return _INVALID_TITLE_CHARS.sub('_', f"{data['학년']}-{data['반']}-{data['번호']} {data['이름']}").strip("'")
+
+
+def _attr(value):
+    return escape_text(value).replace('"', '&quot;')
+
+
+def _quote_sheet(title):
+    return "'" + title.replace("'", "''") + "'"
+
+
+# ----------------------------------------------------
+# 1) ZIP 묶음
+# ----------------------------------------------------
+
+def iter_zip_bundle(jobs, ts=None, engine='template', variant=None):
+    """학생별 .xlsx를 담은 ZIP을 조각(bytes) 단위로 생성합니다. engine은 batch.ENGINES의 생성 방식입니다."""
+    render = ENGINES[engine]
+    writer = ZipStreamWriter(ts)
+    used = set()
+    for job in jobs:
+        name = _unique_file_name(batch_file_name(job['data']), used)
+        # .xlsx는 이미 압축되어 있으므로 다시 압축하지 않고 그대로 저장
+        yield writer.add(name, render(**job, variant=variant), level=0)
+    yield writer.close()
+
+
+# ----------------------------------------------------
+# 2) 통합 문서 (학생별 시트 + 목록 시트)
+# ----------------------------------------------------
+
+def _index_sheet_xml(rows, template):
+    # 목록이 길어도 한꺼번에 문자열로 만들지 않도록 행 단위로 내보냄
+    label, value = template.label_style, template.value_style
+    head = [f'<worksheet xmlns="{_NS_MAIN}"><sheetViews><sheetView tabSelected="1" workbookViewId="0">'
+            '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen" /></sheetView></sheetViews><cols>']
+    for i, width in enumerate(INDEX_WIDTHS, start=1):
+        head.append(f'<col min="{i}" max="{i}" width="{width}" customWidth="1" />')
+    head.append('</cols><sheetData><row r="1">')
+    for col, header in zip("ABCDEFGHI", INDEX_HEADERS):
+        head.append(f'<c r="{col}1" s="{label}" t="inlineStr"><is><t>{escape_text(header)}</t></is></c>')
+    head.append('</row>')
+    yield ''.join(head).encode('utf-8')
+
+    for r, cells in enumerate(rows, start=2):
+        row = [f'<row r="{r}">']
+        for col, cell in zip("ABCDEFGHI", (r - 1,) + cells):
+            if isinstance(cell, int):
+                row.append(f'<c r="{col}{r}" s="{value}"><v>{cell}</v></c>')
+            else:
+                row.append(f'<c r="{col}{r}" s="{value}" t="inlineStr"><is><t>{escape_text(cell)}</t></is></c>')
+        row.append('</row>')
+        yield ''.join(row).encode('utf-8')
+
+    yield b'</sheetData>'
+    if rows:
+        yield b'<hyperlinks>'
+        for r, cells in enumerate(rows, start=2):
+            title = cells[-1]
+            yield f'<hyperlink ref="I{r}" location="{_attr(_quote_sheet(title) + "!A1")}" display="{_attr(title)}" />'.encode('utf-8')
+        yield b'</hyperlinks>'
+    yield b'<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5" /></worksheet>'
+
+
+def _workbook_xml(titles, print_range):
+    yield (f'<workbook xmlns:r="{_NS_REL}" xmlns="{_NS_MAIN}"><workbookPr /><bookViews>'
+           '<workbookView activeTab="0" /></bookViews><sheets>').encode('utf-8')
+    for i, title in enumerate(titles, start=1):
+        yield f'<sheet name="{_attr(title)}" sheetId="{i}" state="visible" r:id="rId{i}" />'.encode('utf-8')
+    yield b'</sheets>'
+    # 목록 시트(0번)를 제외한 신고서 시트마다 인쇄 영역 지정
+    if len(titles) > 1:
+        yield b'<definedNames>'
+        for i, title in enumerate(titles):
+            if i > 0:
+                yield (f'<definedName name="_xlnm.Print_Area" localSheetId="{i}">'
+                       f'{escape_text(_quote_sheet(title))}!{print_range}</definedName>').encode('utf-8')
+        yield b'</definedNames>'
+    yield b'<calcPr calcId="124519" fullCalcOnLoad="1" /></workbook>'
+
+
+def _workbook_rels_xml(count):
+    yield f'<Relationships xmlns="{_NS_PKG_REL}">'.encode('utf-8')
+    for i in range(1, count + 1):
+        yield f'<Relationship Type="{_NS_REL}/worksheet" Target="/xl/worksheets/sheet{i}.xml" Id="rId{i}" />'.encode('utf-8')
+    yield f'<Relationship Type="{_NS_REL}/styles" Target="styles.xml" Id="rId{count + 1}" />'.encode('utf-8')
+    yield f'<Relationship Type="{_NS_REL}/theme" Target="theme/theme1.xml" Id="rId{count + 2}" />'.encode('utf-8')
+    yield b'</Relationships>'
+
+
+def _content_types_xml(template, count):
+    xml = template.raw_parts['[Content_Types].xml'].decode('utf-8')
+    single = re.search(r'<Override PartName="/xl/worksheets/sheet1.xml"[^>]*/>', xml).group(0)
+    before, after = xml.split(single)
+    yield before.encode('utf-8')
+    for i in range(1, count + 1):
+        yield f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{_WORKSHEET_TYPE}" />'.encode('utf-8')
+    yield after.encode('utf-8')
+
+
+def iter_workbook_bundle(jobs, ts=None, variant=None):
+    """학생마다 신고서 시트 하나와 맨 앞의 목록 시트를 가진 .xlsx를 조각(bytes) 단위로 생성합니다."""
+    # 시트 XML을 그대로 옮겨 담으므로 인라인 문자열을 쓰는 일반 출력 템플릿을 씀
+    template = get_template(variant=variant, compact=False)
+    ts = time.time() if ts is None else ts
+    level = template.compress_level
+    writer = ZipStreamWriter(ts)
+
+    # 시트 XML은 바로 내보내고, 목록 시트에 들어갈 한 줄 요약만 남겨 둠
+    used = {INDEX_SHEET_TITLE.lower()}
+    rows = []
+    for i, job in enumerate(jobs, start=2):
+        data = job['data']
+        title = _unique(sheet_title(data), used, limit=31)
+        yield writer.add(f'xl/worksheets/sheet{i}.xml', template.sheet_xml(report_values(**job, variant=variant)), level)
+        period = f"{data['시작일'].isoformat()} ~ {data['종료일'].isoformat()}"
+        rows.append((data['학년'], data['반'], data['번호'], data['이름'], period, data['총_일수'], data['결석_종류'], title))
+
+    count = len(rows) + 1
+    titles = [INDEX_SHEET_TITLE] + [row[-1] for row in rows]
+    yield writer.add_part(ZipPart.from_chunks('xl/worksheets/sheet1.xml', _index_sheet_xml(rows, template), level))
+    yield writer.add_part(ZipPart.from_chunks('xl/workbook.xml', _workbook_xml(titles, template.print_range), level))
+    yield writer.add_part(ZipPart.from_chunks('xl/_rels/workbook.xml.rels', _workbook_rels_xml(count), level))
+    yield writer.add_part(ZipPart.from_chunks('[Content_Types].xml', _content_types_xml(template, count), level))
+    yield writer.add('docProps/core.xml', template.core_xml(ts), level)
+    for name in ('docProps/app.xml', 'xl/theme/theme1.xml', 'xl/styles.xml', '_rels/.rels'):
+        yield writer.add_part(template.static_parts[name])
+    yield writer.close()
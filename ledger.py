@@ -0,0 +1,383 @@
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+
+from roster import student_id
+
+# ----------------------------------------------------
+# 결석 대장 (로컬 SQLite)
+#
+# 생성한 신고서를 학생·결석 종류·기간 단위로 기록해 두고, 다음 신고서를 만들기 전에
+# 규정(신고서 11-1 안내)과 기간 중복 여부를 확인합니다.
+# 같은 학생·종류·기간의 신고서를 다시 만들면(재출력) 새 행을 추가하지 않고 갱신합니다.
+#
+# 보건결석은 화면과 같은 기준으로 '인정' 결석 + 학부모 의견서 첨부인 경우로 봅니다.
+#
+# 통계 화면용 집계 표(stats_*)는 absences에 행이 추가·갱신·삭제될 때 SQLite 트리거가
+# 바로 더하고 빼서 유지합니다. 따라서 통계 화면은 결석 기록 전체를 다시 읽지 않고
+# 작은 집계 표만 읽습니다. 집계 기준은 시작일의 월과 학년도(3월 시작)입니다.
+#
+# 설정 (환경 변수):
+#   LEDGER_PATH       결석 대장 파일 (기본: absence_ledger.sqlite3)
+#   SCHOOL_YEAR_DAYS  학년도 수업일수 (기본: 190, 진급 기준 결석 일수 계산용)
+# ----------------------------------------------------
+
+LEDGER_PATH = os.environ.get("LEDGER_PATH", "absence_ledger.sqlite3")
+
+# 규정 위반/주의 사항 하나: rule(규칙 이름), message(안내 문구)
+Finding = namedtuple("Finding", ["rule", "message"])
+
+SUBMIT_WITHIN_DAYS = 3
+HEALTH_DAYS_PER_MONTH = 1
+DIAGNOSIS_MIN_DAYS = 3
+
+# 수업일수의 2/3 이상 출석해야 진급하므로, 출석으로 인정되지 않는 결석(질병·기타)이 이 일수를 넘으면 안 됨
+SCHOOL_YEAR_DAYS = int(os.environ.get("SCHOOL_YEAR_DAYS", "190"))
+ABSENCE_LIMIT_DAYS = SCHOOL_YEAR_DAYS - -(-SCHOOL_YEAR_DAYS * 2 // 3)
+# 한도의 이 비율 이상 결석한 학생을 '한도 임박'으로 표시
+NEAR_LIMIT_RATIO = 0.8
+# 출석으로 인정되는 결석 종류 (한도 계산에서 제외)
+ATTENDANCE_CREDITED = ('인정',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS absences (
+    id            INTEGER PRIMARY KEY,
+    student_id    TEXT    NOT NULL,
+    grade         INTEGER NOT NULL,
+    class_no      INTEGER NOT NULL,
+    number        INTEGER NOT NULL,
+    name          TEXT    NOT NULL,
+    absence_type  TEXT    NOT NULL,
+    is_health     INTEGER NOT NULL DEFAULT 0,
+    start_date    TEXT    NOT NULL,
+    end_date      TEXT    NOT NULL,
+    days          INTEGER NOT NULL,
+    reason        TEXT    NOT NULL DEFAULT '',
+    has_diagnosis INTEGER NOT NULL DEFAULT 0,
+    has_opinion   INTEGER NOT NULL DEFAULT 0,
+    etc_doc       TEXT    NOT NULL DEFAULT '',
+    issue_date    TEXT    NOT NULL,
+    created_at    TEXT    NOT NULL,
+    UNIQUE (student_id, absence_type, start_date, end_date)
+);
+CREATE INDEX IF NOT EXISTS idx_absences_student_period ON absences (student_id, start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_absences_health ON absences (student_id, start_date) WHERE is_health = 1;
+CREATE INDEX IF NOT EXISTS idx_absences_class ON absences (grade, class_no, start_date);
+
+CREATE TABLE IF NOT EXISTS stats_class_month (
+    school_year   INTEGER NOT NULL,
+    grade         INTEGER NOT NULL,
+    class_no      INTEGER NOT NULL,
+    month         TEXT    NOT NULL,
+    absence_type  TEXT    NOT NULL,
+    reports       INTEGER NOT NULL DEFAULT 0,
+    days          INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (school_year, grade, class_no, month, absence_type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats_student (
+    school_year   INTEGER NOT NULL,
+    student_id    TEXT    NOT NULL,
+    absence_type  TEXT    NOT NULL,
+    grade         INTEGER NOT NULL,
+    class_no      INTEGER NOT NULL,
+    number        INTEGER NOT NULL,
+    name          TEXT    NOT NULL,
+    reports       INTEGER NOT NULL DEFAULT 0,
+    days          INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (school_year, student_id, absence_type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats_health_month (
+    student_id    TEXT    NOT NULL,
+    month         TEXT    NOT NULL,
+    days          INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, month)
+) WITHOUT ROWID;
+"""
+
+# 학년도(3월~다음 해 2월)와 월('YYYY-MM')은 시작일 기준
+_SCHOOL_YEAR_SQL = "CAST(substr({0}.start_date, 1, 4) AS INTEGER) - (substr({0}.start_date, 6, 2) < '03')"
+_MONTH_SQL = "substr({0}.start_date, 1, 7)"
+
+
+def _stats_sql(row, sign):
+    """absences 한 행(NEW 또는 OLD)을 집계 표에 더하거나(sign='+') 빼는(sign='-') SQL 문.
+
+    ON CONFLICT는 충돌 대상(기본 키)을 적어야 SQLite 3.35 이전(3.24 이상)에서도 열립니다.
+    """
+    school_year, month = _SCHOOL_YEAR_SQL.format(row), _MONTH_SQL.format(row)
+    return f"""
+    INSERT INTO stats_class_month (school_year, grade, class_no, month, absence_type, reports, days)
+    VALUES ({school_year}, {row}.grade, {row}.class_no, {month}, {row}.absence_type, {sign}1, {sign}{row}.days)
+    ON CONFLICT (school_year, grade, class_no, month, absence_type) DO UPDATE SET
+        reports = reports + excluded.reports, days = days + excluded.days;
+    INSERT INTO stats_student (school_year, student_id, absence_type, grade, class_no, number, name, reports, days)
+    VALUES ({school_year}, {row}.student_id, {row}.absence_type, {row}.grade, {row}.class_no, {row}.number,
+            {row}.name, {sign}1, {sign}{row}.days)
+    ON CONFLICT (school_year, student_id, absence_type) DO UPDATE SET
+        reports = reports + excluded.reports, days = days + excluded.days;
+    INSERT INTO stats_health_month (student_id, month, days)
+    SELECT {row}.student_id, {month}, {sign}{row}.days WHERE {row}.is_health = 1
+    ON CONFLICT (student_id, month) DO UPDATE SET days = days + excluded.days;"""
+
+
+_STATS_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS trg_absences_stats_insert AFTER INSERT ON absences BEGIN{_stats_sql('NEW', '+')}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_absences_stats_delete AFTER DELETE ON absences BEGIN{_stats_sql('OLD', '-')}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_absences_stats_update AFTER UPDATE ON absences BEGIN{_stats_sql('OLD', '-')}{_stats_sql('NEW', '+')}
+END;
+"""
+
+_STATS_TRIGGER_NAMES = ("trg_absences_stats_insert", "trg_absences_stats_delete", "trg_absences_stats_update")
+
+# 집계 표·트리거가 바뀌면 올려서, 기존 대장 파일을 열 때 트리거와 집계를 처음부터 다시 만들게 함
+# (2: 트리거의 ON CONFLICT에 충돌 대상을 적음)
+_STATS_VERSION = 2
+
+
+def is_health_absence(data, has_opinion):
+    return data['결석_종류'] == '인정' and bool(has_opinion)
+
+
+def _month_range(day):
+    first = day.replace(day=1)
+    following = first.replace(year=first.year + 1, month=1) if first.month == 12 else first.replace(month=first.month + 1)
+    return first, following
+
+
+class AbsenceLedger:
+    """결석 대장. 여러 스레드(Streamlit 세션)에서 연결 하나를 잠금으로 나눠 씁니다."""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version < _STATS_VERSION:
+            # 예전 버전의 트리거는 지우고 새로 만듦
+            for name in _STATS_TRIGGER_NAMES:
+                self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        self._conn.executescript(_STATS_TRIGGERS)
+        if version < _STATS_VERSION:
+            # 집계 표가 생기기 전에 기록된 결석을 한 번 채워 넣음
+            self.rebuild_stats()
+            self._conn.execute(f"PRAGMA user_version = {_STATS_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- 기록 ---
+
+    def _row(self, data, has_diagnosis, has_opinion, etc_doc_val, key, issue_date):
+        return (
+            key or student_id(data['학년'], data['반'], data['번호']),
+            data['학년'], data['반'], data['번호'], data['이름'],
+            data['결석_종류'], int(is_health_absence(data, has_opinion)),
+            data['시작일'].isoformat(), data['종료일'].isoformat(), data['총_일수'],
+            data['사유'], int(bool(has_diagnosis)), int(bool(has_opinion)), etc_doc_val.strip(),
+            (issue_date or date.today()).isoformat(), datetime.now().isoformat(timespec='seconds'),
+        )
+
+    def record(self, data, has_diagnosis, has_opinion, etc_doc_val, key=None, issue_date=None):
+        """생성한 신고서 한 건을 대장에 기록합니다 (같은 학생·종류·기간이면 갱신)."""
+        self.record_many([(data, has_diagnosis, has_opinion, etc_doc_val, key, issue_date)])
+
+    def record_many(self, entries):
+        """(data, has_diagnosis, has_opinion, etc_doc_val, key, issue_date) 여러 건을 한 트랜잭션으로 기록합니다."""
+        rows = [self._row(*entry) for entry in entries]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO absences (student_id, grade, class_no, number, name, absence_type, is_health,"
+                " start_date, end_date, days, reason, has_diagnosis, has_opinion, etc_doc, issue_date, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (student_id, absence_type, start_date, end_date) DO UPDATE SET"
+                " days = excluded.days, reason = excluded.reason, is_health = excluded.is_health,"
+                " has_diagnosis = excluded.has_diagnosis, has_opinion = excluded.has_opinion,"
+                " etc_doc = excluded.etc_doc, issue_date = excluded.issue_date, created_at = excluded.created_at",
+                rows)
+
+    # --- 조회 ---
+
+    def overlapping(self, key, start, end, absence_type=None):
+        """기간이 겹치는 기존 결석 (같은 종류·같은 기간의 재출력 건은 제외)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT absence_type, start_date, end_date FROM absences"
+                " WHERE student_id = ? AND start_date <= ? AND end_date >= ?"
+                " AND NOT (absence_type IS ? AND start_date = ? AND end_date = ?)"
+                " ORDER BY start_date",
+                (key, end.isoformat(), start.isoformat(), absence_type, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        return rows
+
+    def health_days(self, key, first, following, exclude=None):
+        """first 이상 following 미만에 시작한 보건결석 일수 (exclude=(시작일, 종료일) 기간은 제외)."""
+        exclude_start, exclude_end = (d.isoformat() for d in exclude) if exclude else ('', '')
+        with self._lock:
+            (days,) = self._conn.execute(
+                "SELECT COALESCE(SUM(days), 0) FROM absences"
+                " WHERE student_id = ? AND is_health = 1 AND start_date >= ? AND start_date < ?"
+                " AND NOT (start_date = ? AND end_date = ?)",
+                (key, first.isoformat(), following.isoformat(), exclude_start, exclude_end),
+            ).fetchone()
+        return days
+
+    # --- 기간별 내보내기 (학기 통계용) ---
+
+    SUMMARY_COLUMNS = ("student_id", "grade", "class_no", "number", "name", "absence_type",
+                       "start_date", "end_date", "days", "reason", "has_diagnosis", "has_opinion", "etc_doc", "issue_date")
+
+    def iter_period(self, first, last, batch_size=1000):
+        """first~last 사이에 시작한 결석을 학년·반·번호·시작일 순으로 조금씩 읽어 돌려줍니다.
+
+        별도 연결을 쓰므로 읽는 동안에도 다른 스레드의 기록·확인이 막히지 않습니다.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM absences"
+                " WHERE start_date >= ? AND start_date <= ?"
+                " ORDER BY grade, class_no, number, start_date",
+                (first.isoformat(), last.isoformat()))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def totals(self, first, last, group_by):
+        """first~last 사이 결석의 그룹별 (건수, 일수, 학생 수). group_by는 열 이름 목록."""
+        columns = ', '.join(group_by)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {columns}, COUNT(*), SUM(days), COUNT(DISTINCT student_id) FROM absences"
+                " WHERE start_date >= ? AND start_date <= ?"
+                f" GROUP BY {columns} ORDER BY {columns}",
+                (first.isoformat(), last.isoformat())).fetchall()
+
+    # --- 집계 표 (통계 화면용, 기록할 때마다 트리거로 갱신) ---
+
+    def rebuild_stats(self):
+        """집계 표를 absences 전체로부터 다시 만듭니다 (보통은 트리거가 유지하므로 필요 없음)."""
+        school_year, month = _SCHOOL_YEAR_SQL.format('absences'), _MONTH_SQL.format('absences')
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM stats_class_month")
+            self._conn.execute("DELETE FROM stats_student")
+            self._conn.execute("DELETE FROM stats_health_month")
+            self._conn.execute(
+                "INSERT INTO stats_class_month (school_year, grade, class_no, month, absence_type, reports, days)"
+                f" SELECT {school_year}, grade, class_no, {month}, absence_type, COUNT(*), SUM(days) FROM absences"
+                " GROUP BY 1, 2, 3, 4, 5")
+            self._conn.execute(
+                "INSERT INTO stats_student (school_year, student_id, absence_type, grade, class_no, number, name,"
+                " reports, days)"
+                f" SELECT {school_year}, student_id, absence_type, MAX(grade), MAX(class_no), MAX(number), MAX(name),"
+                " COUNT(*), SUM(days) FROM absences GROUP BY 1, 2, 3")
+            self._conn.execute(
+                "INSERT INTO stats_health_month (student_id, month, days)"
+                f" SELECT student_id, {month}, SUM(days) FROM absences WHERE is_health = 1 GROUP BY 1, 2")
+
+    def school_years(self):
+        """기록이 있는 학년도 목록 (최근 순)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT school_year FROM stats_class_month WHERE reports > 0 ORDER BY school_year DESC").fetchall()
+        return [year for (year,) in rows]
+
+    def class_month_totals(self, school_year, group_by):
+        """학년도의 그룹별 (건수, 일수). group_by는 grade, class_no, month, absence_type 중 열 이름 목록."""
+        columns = ', '.join(group_by)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {columns}, SUM(reports), SUM(days) FROM stats_class_month WHERE school_year = ?"
+                f" GROUP BY {columns} HAVING SUM(reports) > 0 ORDER BY {columns}",
+                (school_year,)).fetchall()
+
+    def student_totals(self, school_year, grade=None, class_no=None):
+        """학생별 (학번, 학년, 반, 번호, 이름, 건수, 일수, 질병·인정·기타 일수, 한도 계산 일수)."""
+        where, params = "school_year = ?", [school_year]
+        if grade is not None:
+            where, params = where + " AND grade = ?", params + [grade]
+        if class_no is not None:
+            where, params = where + " AND class_no = ?", params + [class_no]
+        credited = ', '.join('?' for _ in ATTENDANCE_CREDITED)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT student_id, MAX(grade), MAX(class_no), MAX(number), MAX(name), SUM(reports), SUM(days),"
+                " SUM(CASE WHEN absence_type = '질병' THEN days ELSE 0 END),"
+                " SUM(CASE WHEN absence_type = '인정' THEN days ELSE 0 END),"
+                " SUM(CASE WHEN absence_type = '기타' THEN days ELSE 0 END),"
+                f" SUM(CASE WHEN absence_type IN ({credited}) THEN 0 ELSE days END) AS counted"
+                f" FROM stats_student WHERE {where}"
+                " GROUP BY student_id HAVING SUM(reports) > 0 ORDER BY 2, 3, 4",
+                (*ATTENDANCE_CREDITED, *params)).fetchall()
+
+    def near_limit(self, school_year, ratio=NEAR_LIMIT_RATIO):
+        """출석으로 인정되지 않는 결석이 진급 기준 한도(ABSENCE_LIMIT_DAYS)의 ratio 이상인 학생 (많은 순)."""
+        threshold = ABSENCE_LIMIT_DAYS * ratio
+        rows = [row for row in self.student_totals(school_year) if row[-1] >= threshold]
+        return sorted(rows, key=lambda row: -row[-1])
+
+    def health_used(self, month):
+        """month('YYYY-MM')에 보건결석 한도(HEALTH_DAYS_PER_MONTH)를 다 쓴 학생의 (학번, 일수)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT student_id, days FROM stats_health_month WHERE month = ? AND days >= ? ORDER BY student_id",
+                (month, HEALTH_DAYS_PER_MONTH)).fetchall()
+
+    # --- 규정 확인 ---
+
+    def check(self, data, has_diagnosis, has_opinion, etc_doc_val, key=None, issue_date=None):
+        """신고서를 만들기 전에 규정 위반·기간 중복을 확인하여 Finding 목록을 반환합니다."""
+        key = key or student_id(data['학년'], data['반'], data['번호'])
+        issue_date = issue_date or date.today()
+        start, end, days = data['시작일'], data['종료일'], data['총_일수']
+        findings = []
+
+        if start > end:
+            findings.append(Finding("기간", "시작일이 종료일보다 늦습니다."))
+            return findings
+
+        if data['결석_종류'] == '질병' and days >= DIAGNOSIS_MIN_DAYS and not has_diagnosis:
+            findings.append(Finding(
+                "진단서", f"질병결석 {DIAGNOSIS_MIN_DAYS}일 이상은 의사의 진단서 또는 진료확인서를 첨부해야 합니다."))
+
+        if is_health_absence(data, has_opinion):
+            first, following = _month_range(start)
+            used = self.health_days(key, first, following, exclude=(start, end))
+            if used + days > HEALTH_DAYS_PER_MONTH:
+                findings.append(Finding(
+                    "보건결석", f"보건결석은 월 {HEALTH_DAYS_PER_MONTH}일만 인정됩니다 "
+                                f"({start.month}월 기존 {used}일 + 이번 {days}일)."))
+        elif data['결석_종류'] in ('인정', '기타') and not (has_diagnosis or has_opinion or etc_doc_val.strip()):
+            findings.append(Finding("증빙서류", "인정·기타결석은 사유를 인정할 수 있는 증빙서류를 첨부해야 합니다."))
+
+        if (issue_date - end).days > SUBMIT_WITHIN_DAYS:
+            findings.append(Finding(
+                "제출기한", f"결석신고서는 결석한 날로부터 {SUBMIT_WITHIN_DAYS}일 이내에 제출해야 합니다."))
+
+        for absence_type, other_start, other_end in self.overlapping(key, start, end, data['결석_종류']):
+            findings.append(Finding(
+                "기간중복", f"이미 기록된 {absence_type}결석 ({other_start} ~ {other_end})과 기간이 겹칩니다."))
+        return findings
+
+
+_default_ledger = None
+_default_lock = threading.Lock()
+
+
+def get_default_ledger():
+    global _default_ledger
+    with _default_lock:
+        if _default_ledger is None:
+            _default_ledger = AbsenceLedger()
+    return _default_ledger
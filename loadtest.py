@@ -0,0 +1,121 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+# ----------------------------------------------------
+# service.py 부하 시험 (로컬)
+#
+#   python service.py --port 8600 -w 4 --no-ledger   (다른 터미널에서)
+#   python loadtest.py --url http://127.0.0.1:8600 -c 1,4,16,64 -d 5
+#
+# 동시 접속 수(-c)를 늘려 가며 각 단계를 일정 시간(-d) 동안 실행하고
+# 초당 요청 수와 지연 시간 분포(p50/p95/p99/최대)를 출력합니다.
+# 클라이언트마다 연결 하나를 유지(keep-alive)하며 요청을 보냅니다.
+# --distinct를 주면 요청마다 학생 번호를 바꿔 캐시 적중 없이 생성 비용을 잽니다.
+# ----------------------------------------------------
+
+BASE_REQUEST = {
+    "학년": 1, "반": 2, "번호": 3, "이름": "김철수",
+    "시작일": "2025-03-03", "종료일": "2025-03-05",
+    "사유": "독감으로 인한 자가 격리", "결석_종류": "질병",
+    "신고일": "2025-03-06",
+}
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+class _Client(threading.Thread):
+    def __init__(self, host, port, deadline, distinct, offset):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.deadline = deadline
+        self.distinct = distinct
+        self.offset = offset
+        self.latencies = []
+        self.errors = 0
+
+    def _body(self, i):
+        if not self.distinct:
+            return json.dumps(BASE_REQUEST).encode('utf-8')
+        n = self.offset + i
+        return json.dumps(dict(BASE_REQUEST, 반=n // 1000 % 20 + 1, 번호=n % 1000 + 1)).encode('utf-8')
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        i = 0
+        while time.perf_counter() < self.deadline:
+            body = self._body(i)
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request('POST', '/report', body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    self.errors += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                continue
+            self.latencies.append(time.perf_counter() - started)
+        conn.close()
+
+
+def run_level(host, port, concurrency, duration, distinct):
+    deadline = time.perf_counter() + duration
+    clients = [_Client(host, port, deadline, distinct, offset=k * 1_000_000) for k in range(concurrency)]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(t for client in clients for t in client.latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(client.errors for client in clients),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="결석 신고서 서비스 부하 시험")
+    parser.add_argument("--url", default="http://127.0.0.1:8600", help="서비스 주소 (기본: http://127.0.0.1:8600)")
+    parser.add_argument("-c", "--concurrency", default="1,4,16,64", help="동시 접속 수 목록 (기본: 1,4,16,64)")
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="단계별 실행 시간(초) (기본: 5)")
+    parser.add_argument("--distinct", action="store_true", help="요청마다 다른 학생으로 보내 캐시 적중을 피함")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로도 저장")
+    args = parser.parse_args(argv)
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+
+    results = []
+    print(f"{'동시':>5} {'요청':>8} {'오류':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'최대 ms':>8}")
+    for concurrency in (int(c) for c in args.concurrency.split(',')):
+        r = run_level(host, port, concurrency, args.duration, args.distinct)
+        results.append(r)
+        print(f"{r['concurrency']:>5} {r['requests']:>8} {r['errors']:>5} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"url": args.url, "distinct": args.distinct, "results": results}, f, ensure_ascii=False, indent=2)
+    return 1 if any(r['errors'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+import streamlit as st
+from datetime import date
+from timing import span
+from ledger import (ABSENCE_LIMIT_DAYS, HEALTH_DAYS_PER_MONTH, NEAR_LIMIT_RATIO, SCHOOL_YEAR_DAYS,
+                    get_default_ledger)
+
+# ----------------------------------------------------
+# 결석 통계 화면 (학급별 / 종류별 / 월별 / 학생별, 한도 임박 학생)
+#
+# 결석 대장의 집계 표(ledger.py의 stats_*)만 읽습니다. 집계 표는 신고서를 기록할 때마다
+# 트리거로 갱신되므로, 학교 전체 기록이 많아도 화면을 다시 그릴 때 기록 전체를 읽거나
+# 다시 묶지 않습니다.
+# ----------------------------------------------------
+
+page_span = span("dashboard_render")
+
+st.set_page_config(page_title="결석 통계", layout="wide")
+st.title("📊 결석 통계")
+st.caption("신고서를 만들 때마다 갱신되는 결석 대장 집계입니다. 기간은 결석 시작일 기준입니다.")
+
+ABSENCE_TYPES = ('질병', '인정', '기타')
+
+ledger = get_default_ledger()
+school_years = ledger.school_years()
+if not school_years:
+    st.info("아직 결석 대장에 기록된 신고서가 없습니다.")
+    page_span.end()
+    st.stop()
+
+today = date.today()
+current_year = today.year - (today.month < 3)
+school_year = st.selectbox(
+    "학년도", options=school_years, format_func=lambda year: f"{year}학년도",
+    index=school_years.index(current_year) if current_year in school_years else 0)
+
+# ----------------------------------------------------
+# 1. 결석 종류별 합계
+# ----------------------------------------------------
+
+by_type = {absence_type: (reports, days)
+           for absence_type, reports, days in ledger.class_month_totals(school_year, ['absence_type'])}
+columns = st.columns(len(ABSENCE_TYPES) + 1)
+columns[0].metric("전체", f"{sum(days for _, days in by_type.values())}일",
+                  f"신고서 {sum(reports for reports, _ in by_type.values())}건", delta_color="off")
+for column, absence_type in zip(columns[1:], ABSENCE_TYPES):
+    reports, days = by_type.get(absence_type, (0, 0))
+    column.metric(f"{absence_type}결석", f"{days}일", f"신고서 {reports}건", delta_color="off")
+
+# ----------------------------------------------------
+# 2. 월별 결석 일수 (종류별)
+# ----------------------------------------------------
+
+st.subheader("월별 결석 일수")
+by_month = {}
+for month, absence_type, reports, days in ledger.class_month_totals(school_year, ['month', 'absence_type']):
+    by_month.setdefault(month, dict.fromkeys(ABSENCE_TYPES, 0))[absence_type] = days
+st.bar_chart(
+    {"월": list(by_month), **{absence_type: [row[absence_type] for row in by_month.values()]
+                             for absence_type in ABSENCE_TYPES}},
+    x="월", y=list(ABSENCE_TYPES), y_label="일수")
+
+# ----------------------------------------------------
+# 3. 학급별
+# ----------------------------------------------------
+
+st.subheader("학급별 결석")
+by_class = {}
+for grade, class_no, absence_type, reports, days in ledger.class_month_totals(
+        school_year, ['grade', 'class_no', 'absence_type']):
+    row = by_class.setdefault((grade, class_no), {"학년": grade, "반": class_no, "신고서": 0, "일수": 0,
+                                                   **{f"{t} 일수": 0 for t in ABSENCE_TYPES}})
+    row["신고서"] += reports
+    row["일수"] += days
+    row[f"{absence_type} 일수"] = days
+st.dataframe(list(by_class.values()), hide_index=True, use_container_width=True)
+
+# ----------------------------------------------------
+# 4. 한도 임박 학생
+# ----------------------------------------------------
+
+st.subheader("⚠️ 한도 임박 학생")
+near = ledger.near_limit(school_year)
+st.caption(f"출석으로 인정되지 않는 결석(질병·기타)이 진급 기준 한도 {ABSENCE_LIMIT_DAYS}일"
+           f"(수업일수 {SCHOOL_YEAR_DAYS}일의 1/3)의 {NEAR_LIMIT_RATIO:.0%} 이상인 학생")
+if near:
+    st.dataframe(
+        [{"학년": grade, "반": class_no, "번호": number, "이름": name, "한도 계산 일수": counted,
+          "남은 일수": max(0, ABSENCE_LIMIT_DAYS - counted)}
+         for _, grade, class_no, number, name, _, _, _, _, _, counted in near],
+        hide_index=True, use_container_width=True)
+else:
+    st.success("한도에 가까운 학생이 없습니다.")
+
+month = today.strftime("%Y-%m")
+health_used = ledger.health_used(month)
+if health_used:
+    names = {row[0]: f"{row[1]}-{row[2]}-{row[3]} {row[4]}" for row in ledger.student_totals(school_year)}
+    st.caption(f"{today.month}월 보건결석 한도(월 {HEALTH_DAYS_PER_MONTH}일)를 다 쓴 학생 {len(health_used)}명: "
+               + ", ".join(names.get(key, key) for key, _ in health_used))
+
+# ----------------------------------------------------
+# 5. 학생별
+# ----------------------------------------------------
+
+st.subheader("학생별 결석")
+grades = sorted({grade for grade, _ in by_class})
+col_grade, col_class = st.columns(2)
+with col_grade:
+    grade = st.selectbox("학년", options=grades, index=None, placeholder="전체")
+with col_class:
+    class_no = st.selectbox("반", options=sorted(c for g, c in by_class if g == grade), index=None,
+                            placeholder="전체", disabled=grade is None)
+students = ledger.student_totals(school_year, grade, class_no)
+st.dataframe(
+    [{"학번": key, "학년": g, "반": c, "번호": number, "이름": name, "신고서": reports, "일수": days,
+      "질병": sick, "인정": approved, "기타": other, "한도 계산 일수": counted}
+     for key, g, c, number, name, reports, days, sick, approved, other, counted in students],
+    hide_index=True, use_container_width=True)
+
+page_span.end()
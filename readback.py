@@ -0,0 +1,221 @@
+import argparse
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+
+from report import COLUMN_WIDTHS, DEFAULT_VARIANT, STYLES, compile_layout
+
+# ----------------------------------------------------
+# 회수한 결석 신고서(.xlsx) 일괄 읽기 → pandas DataFrame
+#
+#   python readback.py 회수폴더 -o 회수결과.csv
+#   python readback.py 회수폴더 -o 회수결과.xlsx -j 4
+#
+# 칸 위치는 report.LAYOUT을 양식 변형별로 확정한 계획(compile_layout)에서 가져와 값을 읽습니다
+# (교사가 고친 사유, 붙임 서류·결석 종류 체크, 결재 칸 서명 등). 라벨 칸의 고정 문구가 모두
+# 맞는 변형으로 읽으므로, 보호자 의견서가 없는 양식도 알아봅니다. 파일은 openpyxl read_only
+# 모드로 열고 양식 범위만 한 번에 읽으며, 여러 파일은 프로세스 풀로 나누어 처리합니다.
+# 통합 문서(묶음)이면 신고서 시트를 모두 읽습니다.
+#
+# 결과 열 이름은 batch.py 입력 CSV와 같게 맞춰 그대로 다시 생성에 쓸 수 있습니다.
+# ----------------------------------------------------
+
+# 알아볼 양식 변형 (앞에서부터 라벨 칸이 모두 맞는 것으로 읽음, 학교 이름·연도는 칸 위치와 무관)
+READ_VARIANTS = (DEFAULT_VARIANT, DEFAULT_VARIANT._replace(opinion_section=False))
+
+# 양식인지 확인할 고정 문구 칸의 서식 (제목·라벨 칸)
+CHECK_STYLES = ("title", "label", "box", "opinion_header")
+
+# 결재 칸: 양식의 결재란 제목 → 결과 열 이름 (서명 칸은 제목 바로 아래 행)
+APPROVAL_ROLES = {"학급 담임": "학급담임", "출결 담당": "출결담당", "교무 부장": "교무부장", "교감": "교감"}
+
+LAST_COLUMN = len(COLUMN_WIDTHS)
+
+COLUMNS = ("파일", "시트", "학년", "반", "번호", "이름", "시작일", "종료일", "총_일수", "사유", "결석_종류",
+           "진단서", "처방전", "의견서", "기타서류", "증상", "부모님_의견", "신고일") + tuple(
+    f"결재_{role}" for role in APPROVAL_ROLES.values()) + ("결재_완료", "오류")
+
+# 양식 변형 하나의 읽을 위치: checks {칸: 고정 문구}, fields {값 이름: 칸}, approvals {결재 열: 칸}
+SheetLayout = namedtuple("SheetLayout", ["checks", "fields", "approvals", "last_row"])
+
+_STUDENT_RE = re.compile(r"(\d+)\s*학년\s*(\d+)\s*반\s*(\d+)\s*번")
+_DATE_RE = re.compile(r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+_DAYS_RE = re.compile(r"\((\d+)\s*일간\)")
+# [X] 항목 — 괄호 안이 비어 있지 않으면 체크로 봄 (X, V, O, ✓ 등)
+_CHECK_RE = re.compile(r"\[\s*([^\]\s]?)\s*\]\s*([^\[\n]*)")
+_ETC_RE = re.compile(r"기타\s*\((.*)\)\s*$")
+
+NOT_APPLICABLE = "(해당 없음)"
+
+
+def _cell_index(ref):
+    match = re.fullmatch(r"([A-Z])(\d+)", ref)
+    return int(match.group(2)) - 1, ord(match.group(1)) - ord('A')
+
+
+@lru_cache(maxsize=None)
+def sheet_layout(variant=DEFAULT_VARIANT):
+    """양식 계획에서 확인할 고정 문구 칸, 값 칸, 결재 서명 칸의 위치를 모읍니다."""
+    plan = compile_layout(variant)
+    check_styles = [STYLES[name] for name in CHECK_STYLES]
+    checks, approvals = {}, {}
+    for row_number, _, cells in plan.rows:
+        for cell in cells:
+            if cell.text and any(cell.style is style for style in check_styles):
+                checks[cell.ref] = cell.text
+            if cell.text in APPROVAL_ROLES:
+                approvals[f"결재_{APPROVAL_ROLES[cell.text]}"] = f"{cell.ref[0]}{row_number + 1}"
+    return SheetLayout(checks, dict(plan.field_refs), approvals, plan.rows[-1][0])
+
+
+LAST_ROW = max(sheet_layout(variant).last_row for variant in READ_VARIANTS)
+
+
+def _text(grid, ref):
+    row, col = _cell_index(ref)
+    value = grid[row][col] if row < len(grid) and col < len(grid[row]) else None
+    return "" if value is None else str(value).strip()
+
+
+def _parse_date(text):
+    match = _DATE_RE.search(text)
+    return date(*map(int, match.groups())) if match else None
+
+
+def _checked(text):
+    """'[X] 항목' 목록에서 체크된 항목 이름 목록."""
+    return [label.strip() for mark, label in _CHECK_RE.findall(text) if mark]
+
+
+def _match_layout(grid):
+    for variant in READ_VARIANTS:
+        layout = sheet_layout(variant)
+        if all(_text(grid, ref) == expected for ref, expected in layout.checks.items()):
+            return layout
+    return None
+
+
+def parse_sheet(grid):
+    """신고서 시트의 칸 값(행 목록)을 한 줄 레코드로 바꿉니다. 양식이 다르면 None."""
+    layout = _match_layout(grid)
+    if layout is None:
+        return None
+
+    def value(name):
+        # 양식 변형에 없는 칸(예: 보호자 의견서)은 빈 값
+        ref = layout.fields.get(name)
+        return _text(grid, ref) if ref else ""
+
+    record = {}
+    student = _STUDENT_RE.search(value("학생"))
+    record["학년"], record["반"], record["번호"] = map(int, student.groups()) if student else (None, None, None)
+    record["이름"] = value("성명")
+
+    period = value("기간")
+    dates = [date(*map(int, m.groups())) for m in _DATE_RE.finditer(period)]
+    record["시작일"] = dates[0] if dates else None
+    record["종료일"] = dates[1] if len(dates) > 1 else None
+    days = _DAYS_RE.search(period)
+    record["총_일수"] = int(days.group(1)) if days else None
+    record["사유"] = value("사유")
+
+    types = _checked(value("결석종류"))
+    record["결석_종류"] = ",".join(types)
+
+    docs = _checked(value("붙임서류"))
+    record["진단서"] = any(d.startswith("진단서") for d in docs)
+    record["처방전"] = any(d.startswith("병원처방전") for d in docs)
+    record["의견서"] = any(d.startswith("보건결석") for d in docs)
+    etc = next((_ETC_RE.search(d) for d in docs if d.startswith("기타")), None)
+    record["기타서류"] = etc.group(1).strip() if etc else ""
+
+    symptom, opinion = value("증상"), value("부모님의견")
+    record["증상"] = "" if symptom == NOT_APPLICABLE else symptom
+    record["부모님_의견"] = "" if opinion == NOT_APPLICABLE else opinion
+    record["신고일"] = _parse_date(value("확인일"))
+
+    approvals = {column: _text(grid, ref) for column, ref in layout.approvals.items()}
+    record.update(approvals)
+    record["결재_완료"] = all(approvals.values())
+    return record
+
+
+def read_returned_file(path):
+    """파일 하나의 신고서 시트를 모두 읽어 레코드 목록으로 반환합니다 (읽지 못하면 오류 레코드 한 줄)."""
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        return [{"파일": path, "오류": f"파일을 열 수 없습니다: {e}"}]
+    try:
+        records = []
+        for ws in wb.worksheets:
+            grid = list(ws.iter_rows(min_row=1, max_row=LAST_ROW, max_col=LAST_COLUMN, values_only=True))
+            record = parse_sheet(grid)
+            if record is not None:
+                records.append({"파일": path, "시트": ws.title, **record, "오류": ""})
+        return records or [{"파일": path, "오류": "신고서 양식 시트가 없습니다"}]
+    finally:
+        wb.close()
+
+
+def find_returned_files(folder):
+    """폴더(하위 폴더 포함)의 .xlsx 파일 목록. Excel 임시 파일(~$…)은 제외합니다."""
+    paths = []
+    for root, _, files in os.walk(folder):
+        paths.extend(os.path.join(root, name) for name in files
+                     if name.lower().endswith('.xlsx') and not name.startswith('~$'))
+    return sorted(paths)
+
+
+def read_returned(paths, workers=None, chunksize=None):
+    """여러 파일을 프로세스 풀에서 나누어 읽어 DataFrame 하나로 합칩니다 (파일 순서 유지)."""
+    import pandas as pd
+
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        results = [read_returned_file(path) for path in paths]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(read_returned_file, paths, chunksize=chunksize))
+
+    return pd.DataFrame([record for records in results for record in records], columns=list(COLUMNS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="회수한 결석 신고서 일괄 읽기")
+    parser.add_argument("inputs", nargs="+", help="신고서 .xlsx 파일 또는 폴더")
+    parser.add_argument("-o", "--output", default="회수결과.csv", help="저장할 파일 (.csv 또는 .xlsx, 기본: 회수결과.csv)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for item in args.inputs:
+        paths.extend(find_returned_files(item) if os.path.isdir(item) else [item])
+
+    started = time.perf_counter()
+    df = read_returned(paths, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    if args.output.lower().endswith('.xlsx'):
+        df.to_excel(args.output, index=False)
+    else:
+        df.to_csv(args.output, index=False, encoding='utf-8-sig')
+
+    errors = int((df["오류"].fillna("") != "").sum())
+    rate = len(paths) / elapsed if elapsed > 0 else 0.0
+    print(f"파일 {len(paths)}개에서 신고서 {len(df) - errors}건 읽음, 오류 {errors}건 → {args.output} "
+          f"({elapsed:.2f}초, {rate:.1f} files/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,279 @@
+import os
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+from io import BytesIO
+from openpyxl import Workbook
+from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
+from timing import span
+
+# ----------------------------------------------------
+# 결석 신고서 Excel 생성 (Streamlit 없이 사용 가능한 모듈)
+#
+# 양식은 아래 LAYOUT(행 목록)으로 선언합니다. 각 행은 칸(병합 범위, 고정 문구 또는 값 이름,
+# 서식 이름)과 행 높이로 이루어지며, compile_layout()이 학교·연도·보호자 의견서 포함 여부
+# (FormVariant)별로 한 번만 행 번호와 문구를 확정해 캐시합니다. 신고서마다 이 계획을 그대로
+# 재생하므로 양식 변형이 여러 개 있어도 배치 계산을 다시 하지 않습니다.
+#
+# 설정 (환경 변수):
+#   SCHOOL_NAME  기본 양식의 학교 이름 (기본: 대동세무고등학교)
+# ----------------------------------------------------
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+SCHOOL_NAME = os.environ.get("SCHOOL_NAME", "대동세무고등학교")
+
+# 공통 서식 (신고서와 통계 파일에서 함께 사용)
+THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+CENTER_ALIGN = Alignment(horizontal='center', vertical='center', wrap_text=True)
+LEFT_ALIGN = Alignment(horizontal='left', vertical='center', wrap_text=True)
+TITLE_FONT = Font(size=14, bold=True)
+HEADER_FONT = Font(bold=True)
+
+
+# 양식 변형: 학교 이름, 날짜에 찍을 연도(None이면 날짜의 연도), 보호자 의견서(2페이지 하단) 포함 여부
+FormVariant = namedtuple("FormVariant", ["school_name", "year", "opinion_section"], defaults=(SCHOOL_NAME, None, True))
+
+DEFAULT_VARIANT = FormVariant()
+
+
+# ----------------------------------------------------
+# 양식 선언
+# ----------------------------------------------------
+
+CellStyle = namedtuple("CellStyle", ["font", "fill", "alignment", "border"], defaults=(None, None, None, None))
+
+STYLES = {
+    "form_no": CellStyle(font=Font(size=10), alignment=Alignment(horizontal='right')),
+    "title": CellStyle(font=TITLE_FONT, alignment=CENTER_ALIGN),
+    "note": CellStyle(font=Font(size=9), alignment=Alignment(horizontal='left', wrap_text=True)),
+    "label": CellStyle(font=HEADER_FONT, alignment=CENTER_ALIGN, border=THIN_BORDER),
+    "value": CellStyle(alignment=LEFT_ALIGN, border=THIN_BORDER),
+    "box": CellStyle(alignment=CENTER_ALIGN, border=THIN_BORDER),
+    "blank_box": CellStyle(border=THIN_BORDER),
+    "text_left": CellStyle(alignment=LEFT_ALIGN),
+    "sign_right": CellStyle(alignment=Alignment(horizontal='right', vertical='bottom', wrap_text=True)),
+    "confirm": CellStyle(alignment=Alignment(horizontal='left', vertical='center')),
+    "date_right": CellStyle(alignment=Alignment(horizontal='right', vertical='bottom')),
+    "addressee": CellStyle(alignment=Alignment(horizontal='right', vertical='center')),
+    "rules_header": CellStyle(font=Font(size=10, bold=True), alignment=LEFT_ALIGN,
+                              fill=PatternFill(start_color="EEEEEE", end_color="EEEEEE", fill_type="solid")),
+    "rules": CellStyle(font=Font(size=9), alignment=Alignment(horizontal='left', vertical='top', wrap_text=True),
+                       border=THIN_BORDER),
+    "opinion_header": CellStyle(font=Font(size=10, bold=True), alignment=LEFT_ALIGN,
+                                fill=PatternFill(start_color="CCCCFF", end_color="CCCCFF", fill_type="solid")),
+    "opinion_value": CellStyle(alignment=Alignment(horizontal='left', vertical='top', wrap_text=True), border=THIN_BORDER),
+}
+
+# 칸: columns는 "A:E"(병합) 또는 "B"(한 칸), text는 고정 문구({school_name} 치환), field는 report_values()의 키
+Cell = namedtuple("Cell", ["columns", "text", "field", "style"])
+# 행: skip은 이 행 앞에 비워 둘 행 수, section은 양식 변형에 따라 빼는 구역 이름
+Row = namedtuple("Row", ["cells", "height", "skip", "section"])
+
+
+def text(columns, value, style=None):
+    return Cell(columns, value, None, style)
+
+
+def field(columns, name, style=None):
+    return Cell(columns, None, name, style)
+
+
+def row(*cells, height=None, skip=0, section=None):
+    return Row(cells, height, skip, section)
+
+
+def labeled(label, name, height=None):
+    """'라벨 | 값' 한 줄 (A:B 라벨, C:E 값)."""
+    return row(text("A:B", label, "label"), field("C:E", name, "value"), height=height)
+
+
+RULE_TEXT = (
+    "1. 질병결석 2일 이내: 결석신고서와 담임교사 확인서\n"
+    "2. 질병결석 3일 이상: 결석신고서, 담임교사 확인서 및 ① 의사의 진단서, ② 의견서(진료확인서 등) 중 택1\n"
+    "3. 보건결석: 의사소견서 또는 학부모 의견서 첨부 (월 1일만 인정)\n"
+    "4. 그 외 인정 및 기타결석: 사유를 인정할 수 있는 증빙서류 첨부\n"
+    "5. 고사기간 중의 질병결석: 의사의 진단서 반드시 첨부"
+)
+
+# A, B열 너비 축소 / C, D, E열 확대
+COLUMN_WIDTHS = {'A': 10, 'B': 10, 'C': 18, 'D': 18, 'E': 18}
+
+LAYOUT = (
+    # --- 1. 문서 제목 및 안내 ---
+    row(text("A:E", "학업성적관리규정 [결석계 서식]", "form_no")),
+    row(text("A:E", "결 석 신 고 서", "title"), height=25),
+    row(text("A:E", "※ 결석신고서는 결석한 날로부터 3일 이내에 제출하여 학교의 승인을 받아야 합니다.", "note"), height=15),
+    # --- 2~6. 학생 정보, 기간, 성명, 사유, 붙임 서류 ---
+    labeled("학생", "학생"),
+    labeled("기간", "기간", height=20),
+    row(text("A:E", "※ 결석 기간 중 공휴일 또는 학교 휴무일은 결석일 수에 포함하지 않습니다.", "note"), height=15),
+    labeled("성명", "성명"),
+    labeled("사유", "사유", height=60),
+    labeled("붙임 서류", "붙임서류", height=70),
+    # --- 7. 유의사항 및 보호자 연서 ---
+    row(text("A:E", "※ 규정된 증빙서류를 첨부하지 않으면 '미인정(무단)' 결석 처리됩니다.", "note"), height=15),
+    row(field("A:E", "연서", "sign_right"), height=40),
+    row(field("A:C", "학생서명", "text_left"), text("D:E", "보호자 성명: (서명 또는 인)", "text_left"), height=30),
+    # --- 8. 담임교사 확인서 ---
+    row(text("A:E", "담임교사 확인서", "title"), height=25, skip=1),
+    labeled("결석 종류", "결석종류"),
+    row(text("A:B", "확인 방법", "label"), text("C:E", "[X] 제출된 증빙서류로 확인", "value")),
+    # --- 9. 교사 확인 문구 및 날짜 ---
+    row(text("A:E", "위의 신고 내용이 사실과 같음을 확인합니다.", "confirm"), height=20),
+    row(field("A:E", "확인일", "date_right"), height=25),
+    # --- 10. 결재 라인 (담임교사는 B열부터) ---
+    row(text("B", "학급 담임", "box"), text("C", "출결 담당", "box"), text("D", "교무 부장", "box"), text("E", "교감", "box")),
+    row(*(text(col, None, "blank_box") for col in "BCDE"), height=30),
+    row(text("A:E", "{school_name}장 귀하", "addressee"), height=20),
+    # --- 11-1. 2페이지: 결석 종류별 증빙자료 규정 ---
+    row(text("A:E", "※ 결석 종류별 증빙자료 관련 규정 안내", "rules_header"), height=20, skip=1),
+    row(text("A:E", RULE_TEXT, "rules"), height=80),
+    # --- 11-2. 2페이지: 보호자 의견서 ---
+    row(text("A:E", "보호자 의견서 (보건결석인 경우만 작성)", "opinion_header"), height=20, section="opinion"),
+    row(text("A:B", "증상", "box"), field("C:E", "증상", "value"), height=30, section="opinion"),
+    row(text("A:B", "부모님 의견", "box"), field("C:E", "부모님의견", "opinion_value"), height=50, section="opinion"),
+    row(text("A:E", "학생과의 관계: (      ) 보호자 성명: (서명 또는 인)", "date_right"), height=30, section="opinion"),
+)
+
+
+# ----------------------------------------------------
+# 양식 계획 (양식 변형별로 한 번만 계산)
+# ----------------------------------------------------
+
+# 확정된 칸: ref(왼쪽 위 칸), merge(병합 범위 또는 None), text(고정 문구), field, style(CellStyle)
+PlannedCell = namedtuple("PlannedCell", ["ref", "merge", "text", "field", "style"])
+LayoutPlan = namedtuple("LayoutPlan", ["variant", "rows", "fields", "field_refs", "print_area"])
+
+
+@lru_cache(maxsize=None)
+def compile_layout(variant=DEFAULT_VARIANT):
+    """LAYOUT을 양식 변형에 맞춰 행 번호·병합 범위·문구까지 확정한 LayoutPlan으로 만듭니다."""
+    skipped = set() if variant.opinion_section else {"opinion"}
+    rows = []
+    field_refs = {}
+    current_row = 0
+    for spec in LAYOUT:
+        if spec.section in skipped:
+            continue
+        current_row += 1 + spec.skip
+        cells = []
+        for cell in spec.cells:
+            first, _, last = cell.columns.partition(':')
+            ref = f"{first}{current_row}"
+            merge = f"{ref}:{last}{current_row}" if last else None
+            value = cell.text.format(school_name=variant.school_name) if cell.text else cell.text
+            if cell.field:
+                field_refs[cell.field] = ref
+            cells.append(PlannedCell(ref, merge, value, cell.field, STYLES[cell.style] if cell.style else None))
+        rows.append((current_row, spec.height, tuple(cells)))
+    return LayoutPlan(variant, tuple(rows), tuple(field_refs), field_refs, f'A1:E{current_row}')
+
+
+def format_date(day, variant=DEFAULT_VARIANT):
+    return f"{variant.year or day.year}년 {day:%m}월 {day:%d}일"
+
+
+def report_values(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None, variant=None):
+    """신고서에서 입력값에 따라 달라지는 칸의 문자열을 계산합니다 (나머지 칸은 고정 양식)."""
+    variant = variant or DEFAULT_VARIANT
+    # 신고일(작성일)은 지정하지 않으면 오늘 날짜를 사용
+    if issue_date is None:
+        issue_date = date.today()
+    issue_str = format_date(issue_date, variant)
+
+    period_str = f"{format_date(data['시작일'], variant)}부터 ~ {format_date(data['종료일'], variant)}까지 ({data['총_일수']}일간)"
+
+    doc_list = []
+    doc_list.append(f"[{'X' if has_diagnosis else ' '}] 진단서 또는 진료 확인서 (3일 이상인 경우 꼭 첨부)")
+    doc_list.append(f"[] 병원처방전 또는 약봉투")
+    doc_list.append(f"[{'X' if has_opinion else ' '}] 보건결석 학부모 의견서")
+
+    is_none = not (has_diagnosis or has_opinion or etc_doc_val.strip())
+    doc_list.append(f"[{'X' if is_none else ' '}] 없음")
+
+    if etc_doc_val.strip():
+        doc_list.append(f"[{'X'}] 기타 ({etc_doc_val})")
+    else:
+        doc_list.append(f"[] 기타 ()")
+
+    chk_질병 = 'X' if data['결석_종류'] == '질병' else ' '
+    chk_인정 = 'X' if data['결석_종류'] == '인정' else ' '
+    chk_기타 = 'X' if data['결석_종류'] == '기타' else ' '
+
+    return {
+        "학생": f"{data['학년']}학년 {data['반']}반 {data['번호']}번",
+        "기간": period_str,
+        "성명": data['이름'],
+        "사유": data['사유'],
+        "붙임서류": '\n'.join(doc_list),
+        "연서": f"위와 같이 결석하고자 하였기에 보호자 연서로 신고합니다. \n\n {issue_str}",
+        "학생서명": f"학생 성명: {data['이름']} (서명 또는 인)",
+        "결석종류": f"[{chk_질병}] 질병  [{chk_인정}] 인정  [{chk_기타}] 기타",
+        "확인일": issue_str,
+        "증상": symptom if data['결석_종류'] == '인정' else "(해당 없음)",
+        "부모님의견": parent_opinion if data['결석_종류'] == '인정' else "(해당 없음)",
+    }
+
+
+def create_excel_report(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None, variant=None):
+    values = report_values(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date, variant)
+    return build_report_workbook(values, variant)
+
+
+def build_report_workbook(values, variant=None):
+    """report_values()가 계산한 문자열로 양식 계획을 재생하여 신고서 Workbook을 만듭니다."""
+    plan = compile_layout(variant or DEFAULT_VARIANT)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "결석신고서"
+
+    for column, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+
+    for row_number, height, cells in plan.rows:
+        for cell in cells:
+            if cell.merge:
+                ws.merge_cells(cell.merge)
+            target = ws[cell.ref]
+            if cell.field:
+                target.value = values[cell.field]
+            elif cell.text is not None:
+                target.value = cell.text
+            style = cell.style
+            if style is not None:
+                if style.font is not None:
+                    target.font = style.font
+                if style.fill is not None:
+                    target.fill = style.fill
+                if style.alignment is not None:
+                    target.alignment = style.alignment
+                if style.border is not None:
+                    target.border = style.border
+        if height is not None:
+            ws.row_dimensions[row_number].height = height
+
+    # 인쇄 영역 설정 (A4 1페이지에 맞춤)
+    ws.page_setup.fitToPages = True
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 0
+    ws.page_setup.orientation = 'portrait'
+
+    ws.print_area = plan.print_area
+
+    return wb
+
+
+def render_report(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None, variant=None):
+    """신고서를 생성하여 .xlsx 바이트로 반환합니다."""
+    # openpyxl 방식은 값과 서식을 함께 채우므로 서식 시간도 build에 포함됨
+    with span("build"):
+        wb = create_excel_report(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date, variant)
+    with span("serialize"):
+        excel_buffer = BytesIO()
+        wb.save(excel_buffer)
+    return excel_buffer.getvalue()
+
+
+def report_file_name(data):
+    return f"결석신고서_Excel_{data['이름']}_{data['시작일'].strftime('%Y%m%d')}.xlsx"
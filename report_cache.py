@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from report import report_values
+from xlsx_template import get_template
+
+# ----------------------------------------------------
+# 생성된 신고서(.xlsx 바이트) 캐시 — 메모리 + 디스크 2단계, LRU 방식
+#
+# 키는 입력값 자체가 아니라 report_values()가 계산한 "실제로 종이에 찍히는 문자열"과
+# 양식 지문(fingerprint)의 SHA-256입니다. 따라서 결과가 같은 입력은 같은 키가 되고,
+# 양식이 바뀌면 예전 결과는 자동으로 쓰이지 않습니다. 양식 변형(학교명·연도·보호자 의견서
+# 유무)마다 지문이 다르므로 변형끼리도 섞이지 않습니다.
+#
+# 설정 (환경 변수):
+#   REPORT_CACHE_DIR        디스크 캐시 폴더 (기본: .report_cache, 빈 값이면 디스크 캐시 끔)
+#   REPORT_CACHE_MEMORY_MB  메모리 캐시 한도 (기본: 64)
+#   REPORT_CACHE_DISK_MB    디스크 캐시 한도 (기본: 512)
+# ----------------------------------------------------
+
+MB = 1024 * 1024
+
+
+def values_key(values, variant=None):
+    """report_values() 결과를 정규화된 JSON으로 만들어 양식 지문과 함께 해시합니다."""
+    digest = hashlib.sha256(get_template(variant=variant).fingerprint.encode('ascii'))
+    digest.update(json.dumps(values, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """키 → .xlsx 바이트. 메모리에서 밀려난 항목은 디스크에 남아 있다가 다시 올라옵니다."""
+
+    def __init__(self, directory=None, memory_limit=64 * MB, disk_limit=512 * MB):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        # 디스크 항목의 LRU 순서와 크기 (시작 시 파일 수정 시각 순으로 복원)
+        self._disk = OrderedDict()
+        self._disk_size = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._scan_disk()
+
+    # --- 디스크 ---
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.xlsx')
+
+    def _scan_disk(self):
+        entries = []
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith('.xlsx'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.name[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # 다른 프로세스가 지웠을 수 있음
+            size = self._disk.pop(key, None)
+            if size is not None:
+                self._disk_size -= size
+            return None
+        os.utime(path)
+        self._disk.move_to_end(key)
+        return data
+
+    def _write_disk(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 쓰는 도중에 읽히지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        self._disk_size += len(data) - self._disk.pop(key, 0)
+        self._disk[key] = len(data)
+        while self._disk_size > self.disk_limit and len(self._disk) > 1:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    # --- 메모리 ---
+
+    def _put_memory(self, key, data):
+        if len(data) > self.memory_limit:
+            return
+        self._memory_size += len(data) - len(self._memory.pop(key, b''))
+        self._memory[key] = data
+        while self._memory_size > self.memory_limit:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+
+    # --- 공개 API ---
+
+    def get(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            if self.directory and key in self._disk:
+                data = self._read_disk(key)
+                if data is not None:
+                    self._put_memory(key, data)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return data
+            self.misses += 1
+            return None
+
+    def put(self, key, data):
+        with self._lock:
+            self._put_memory(key, data)
+            if self.directory:
+                self._write_disk(key, data)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            for key in list(self._disk):
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._disk.clear()
+            self._disk_size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_items": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ReportCache(
+                directory=os.environ.get("REPORT_CACHE_DIR", ".report_cache") or None,
+                memory_limit=int(os.environ.get("REPORT_CACHE_MEMORY_MB", "64")) * MB,
+                disk_limit=int(os.environ.get("REPORT_CACHE_DISK_MB", "512")) * MB,
+            )
+    return _default_cache
+
+
+def render_report_cached(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None,
+                         cache=None, variant=None):
+    """같은 내용의 신고서는 캐시에서 바로 돌려주고, 없으면 생성하여 저장합니다."""
+    cache = cache or get_default_cache()
+    values = report_values(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date, variant)
+    key = values_key(values, variant)
+
+    excel_bytes = cache.get(key)
+    if excel_bytes is None:
+        excel_bytes = get_template(variant=variant).render_values(values)
+        cache.put(key, excel_bytes)
+    return excel_bytes
@@ -0,0 +1,157 @@
+import os
+from bisect import bisect_left
+
+# ----------------------------------------------------
+# 학생 명단 (CSV/Excel) 불러오기 및 검색용 색인
+#
+# 명단 파일 열: 학년, 반, 번호, 이름 (+ 선택: 학번)
+# 학번 열이 없으면 학년/반/번호로 만듭니다 (예: 1학년 2반 3번 → "10203").
+# 파일은 한 번만 읽고, 파일 수정 시각(mtime)이 바뀔 때만 다시 읽습니다.
+#
+# 결석 대장은 학번으로 학생을 구분하므로, 신고서를 기록하는 곳(화면, batch.py, service.py,
+# attendance.py)은 모두 student_key()로 명단의 학번을 찾아 씁니다.
+#
+# 설정 (환경 변수):
+#   ROSTER_PATH  학생 명단 파일 (기본: students.csv)
+# ----------------------------------------------------
+
+ROSTER_PATH = os.environ.get("ROSTER_PATH", "students.csv")
+
+REQUIRED_COLUMNS = ("학년", "반", "번호", "이름")
+
+# {절대 경로: ((mtime_ns, size), Roster)}
+_CACHE = {}
+
+
+def student_id(grade, cls, number):
+    return f"{grade}{cls:02d}{number:02d}"
+
+
+def student_label(s):
+    return f"{s['학년']}-{s['반']}-{s['번호']} {s['이름']}"
+
+
+def student_key(data, roster=None):
+    """신고서 data의 학생을 결석 대장에 기록할 학번. 명단에 있으면 명단의 학번(학번 열)을 씁니다."""
+    if roster is not None:
+        return roster.key_of(data['학년'], data['반'], data['번호'])
+    return student_id(data['학년'], data['반'], data['번호'])
+
+
+class Roster:
+    """학번 → 학생 정보와 학년/반, 이름·학번 앞부분 검색 색인."""
+
+    def __init__(self, students):
+        # students: {학번: {"학년", "반", "번호", "이름"}}
+        self.students = students
+        self.labels = {key: student_label(s) for key, s in students.items()}
+
+        self.by_class = {}
+        self._by_number = {}
+        for key, s in students.items():
+            self.by_class.setdefault((s['학년'], s['반']), []).append(key)
+            self._by_number[(s['학년'], s['반'], s['번호'])] = key
+        for keys in self.by_class.values():
+            keys.sort(key=lambda k: students[k]['번호'])
+
+        self.grades = sorted({grade for grade, _ in self.by_class})
+        self._classes = {}
+        for grade, cls in sorted(self.by_class):
+            self._classes.setdefault(grade, []).append(cls)
+
+        # 앞부분 일치 검색은 정렬된 목록에서 이진 탐색
+        self._names = sorted((s['이름'], key) for key, s in students.items())
+        self._ids = sorted(students)
+
+    def __len__(self):
+        return len(self.students)
+
+    def __contains__(self, key):
+        return key in self.students
+
+    def __getitem__(self, key):
+        return self.students[key]
+
+    def label(self, key):
+        return self.labels[key]
+
+    def key_of(self, grade, cls, number):
+        """학년/반/번호의 학번. 명단에 없으면 학년/반/번호로 만든 학번을 돌려줍니다."""
+        return self._by_number.get((grade, cls, number)) or student_id(grade, cls, number)
+
+    def classes(self, grade):
+        return self._classes.get(grade, [])
+
+    def in_class(self, grade, cls):
+        return self.by_class.get((grade, cls), [])
+
+    def search(self, query, limit=20):
+        """이름 또는 학번의 앞부분으로 학생을 찾아 학번 목록을 반환합니다."""
+        query = query.strip()
+        if not query:
+            return []
+
+        found = []
+        if query.isdigit():
+            i = bisect_left(self._ids, query)
+            while i < len(self._ids) and self._ids[i].startswith(query) and len(found) < limit:
+                found.append(self._ids[i])
+                i += 1
+        else:
+            i = bisect_left(self._names, (query,))
+            while i < len(self._names) and self._names[i][0].startswith(query) and len(found) < limit:
+                found.append(self._names[i][1])
+                i += 1
+        return found
+
+
+def read_roster(path):
+    """명단 파일을 pandas로 읽어 Roster를 만듭니다 (캐시 없이 항상 새로 읽음)."""
+    import pandas as pd  # 무거운 모듈이라 명단 파일을 처음 읽을 때 불러옴
+
+    if path.lower().endswith(('.xlsx', '.xlsm', '.xls')):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        df = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    df.columns = [str(c).strip() for c in df.columns]
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"명단 파일에 필요한 열이 없습니다: {', '.join(missing)}")
+
+    df = df.dropna(subset=list(REQUIRED_COLUMNS))
+    grades = df["학년"].astype(int).tolist()
+    classes = df["반"].astype(int).tolist()
+    numbers = df["번호"].astype(int).tolist()
+    names = df["이름"].str.strip().tolist()
+    if "학번" in df.columns:
+        ids = [str(v).strip() if isinstance(v, str) and v.strip() else student_id(g, c, n)
+               for v, g, c, n in zip(df["학번"].tolist(), grades, classes, numbers)]
+    else:
+        ids = [student_id(g, c, n) for g, c, n in zip(grades, classes, numbers)]
+
+    students = {
+        key: {"학년": g, "반": c, "번호": n, "이름": name}
+        for key, g, c, n, name in zip(ids, grades, classes, numbers, names)
+    }
+    return Roster(students)
+
+
+def load_roster(path):
+    """명단을 읽어 캐시합니다. 파일이 바뀌면(mtime/크기) 자동으로 다시 읽습니다."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    roster = read_roster(path)
+    _CACHE[path] = (stamp, roster)
+    return roster
+
+
+def find_roster(path=ROSTER_PATH):
+    """명단 파일이 있으면 읽어(캐시) 돌려주고, 없으면 None을 돌려줍니다."""
+    return load_roster(path) if path and os.path.exists(path) else None
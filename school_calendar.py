@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# ----------------------------------------------------
+# 학사 일정 기반 결석 일수 계산
+#
+# 결석 일수에는 공휴일과 학교 휴업일이 들어가지 않으므로, 학사 일정 파일을 한 번 읽어
+# NumPy 영업일 달력(busdaycalendar)으로 만들어 두고 기간별 등교일 수를 셉니다.
+# 여러 기간도 배열 한 번의 호출로 계산합니다 (일괄 생성·학기 통계용).
+#
+# 학사 일정 파일 (CSV/xlsx) 열: 날짜, 구분 [, 내용]
+#   구분 = 공휴일 | 휴업일 : 등교하지 않는 평일
+#          등교일          : 주말이지만 등교하는 날 (보강일 등)
+#
+# 설정 (환경 변수):
+#   SCHOOL_CALENDAR_PATH  학사 일정 파일 (기본: 이 모듈 옆의 school_calendar.csv,
+#                         어느 폴더에서 batch.py·service.py 등을 실행해도 같은 파일을 씀)
+#   SCHOOL_WEEKMASK       월~일 등교 요일 (기본: 1111100 = 월~금, 예: 토요일 등교는 1111110)
+# ----------------------------------------------------
+
+CALENDAR_PATH = (os.environ.get("SCHOOL_CALENDAR_PATH")
+                 or os.path.join(os.path.dirname(os.path.abspath(__file__)), "school_calendar.csv"))
+WEEKMASK = os.environ.get("SCHOOL_WEEKMASK", "1111100")
+
+DAYS_OFF = ("공휴일", "휴업일")
+EXTRA_DAY = "등교일"
+
+_ONE_DAY = np.timedelta64(1, 'D')
+
+# {절대 경로: ((mtime_ns, size, weekmask), SchoolCalendar)}
+_CACHE = {}
+_cache_lock = threading.Lock()
+# 없다고 이미 알린 학사 일정 파일 경로
+_missing_paths = set()
+
+
+def _to_days(values):
+    return np.asarray(values, dtype='datetime64[D]')
+
+
+class SchoolCalendar:
+    """등교일 판정: weekmask(월~일) + 쉬는 날 목록 + 주말 등교일 목록."""
+
+    def __init__(self, days_off=(), extra_days=(), weekmask=WEEKMASK):
+        self.weekmask = weekmask
+        self.days_off = np.unique(_to_days(list(days_off)))
+        self.extra_days = np.unique(_to_days(list(extra_days)))
+        self._busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=self.days_off)
+        # 주말 등교일은 원래 등교일이 아닌 날만 더함 (평일과 겹치면 중복 계산 방지)
+        if len(self.extra_days):
+            self.extra_days = self.extra_days[~np.is_busday(self.extra_days, busdaycal=self._busdaycal)]
+
+    def school_days(self, start, end):
+        """start~end(양 끝 포함) 사이의 등교일 수. start가 end보다 늦으면 0."""
+        if start > end:
+            return 0
+        return int(self.school_days_array([start], [end])[0])
+
+    def school_days_array(self, starts, ends):
+        """여러 (시작일, 종료일) 쌍의 등교일 수를 한 번에 계산하여 정수 배열로 반환합니다."""
+        starts = _to_days(starts)
+        ends = _to_days(ends)
+        counts = np.busday_count(starts, ends + _ONE_DAY, busdaycal=self._busdaycal)
+        if len(self.extra_days):
+            counts += (np.searchsorted(self.extra_days, ends, side='right')
+                       - np.searchsorted(self.extra_days, starts, side='left'))
+        return np.where(starts > ends, 0, counts)
+
+
+def read_calendar(path, weekmask=WEEKMASK):
+    """학사 일정 파일을 읽어 SchoolCalendar를 만듭니다 (캐시 없이 항상 새로 읽음)."""
+    import pandas as pd  # 무거운 모듈이라 학사 일정 파일을 처음 읽을 때 불러옴
+
+    if path.lower().endswith(('.xlsx', '.xlsm', '.xls')):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        df = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    df.columns = [str(c).strip() for c in df.columns]
+
+    missing = [c for c in ("날짜", "구분") if c not in df.columns]
+    if missing:
+        raise ValueError(f"학사 일정 파일에 필요한 열이 없습니다: {', '.join(missing)}")
+
+    kind = df["구분"].str.strip()
+    days = pd.to_datetime(df["날짜"].str.strip()).dt.date
+    return SchoolCalendar(
+        days_off=days[kind.isin(DAYS_OFF)].tolist(),
+        extra_days=days[kind == EXTRA_DAY].tolist(),
+        weekmask=weekmask,
+    )
+
+
+@lru_cache(maxsize=None)
+def _weekend_calendar(weekmask):
+    return SchoolCalendar(weekmask=weekmask)
+
+
+def load_calendar(path=CALENDAR_PATH, weekmask=WEEKMASK):
+    """학사 일정을 읽어 캐시합니다. 파일이 없으면 (한 번 알리고) 주말만 제외하는 달력을 씁니다."""
+    if not os.path.exists(path):
+        if path not in _missing_paths:
+            _missing_paths.add(path)
+            print(f"학사 일정 파일({path})이 없어 주말만 제외하고 결석 일수를 셉니다.", file=sys.stderr)
+        return _weekend_calendar(weekmask)
+
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size, weekmask)
+    with _cache_lock:
+        cached = _CACHE.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        calendar = read_calendar(path, weekmask)
+        _CACHE[path] = (stamp, calendar)
+        return calendar
+
+
+# 총 일수 계산 (공휴일·휴업일 제외)
+def calculate_days(start, end):
+    return load_calendar().school_days(start, end)
+
+
+def calendar_days(start, end):
+    # 달력상 일수 (참고용: 공휴일·주말 포함)
+    if start > end: return 0
+    return (end - start).days + 1
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from batch import add_variant_arguments, build_job, variant_from_args
+from ledger import LEDGER_PATH, AbsenceLedger
+from report import XLSX_MIME, report_file_name
+from report_cache import render_report_cached
+from roster import ROSTER_PATH, find_roster, student_key
+from school_calendar import calculate_days
+from timing import STATS, span
+from xlsx_template import get_template
+
+# ----------------------------------------------------
+# 결석 신고서 생성 HTTP 서비스 (Streamlit 불필요, 학사 시스템 연동용)
+#
+#   python service.py --port 8600 -w 4
+#   python service.py --school 한빛고등학교 --no-opinion   (양식 변형, 모든 요청에 적용)
+#
+#   POST /report   JSON → .xlsx 바이트
+#       {"학년": 1, "반": 2, "번호": 3, "이름": "김철수", "시작일": "2025-03-03", "종료일": "2025-03-05",
+#        "사유": "독감", "결석_종류": "질병",
+#        선택: "총_일수", "진단서", "의견서", "기타서류", "증상", "부모님_의견", "신고일"}
+#       빠진 선택 값은 화면(app.py)·batch.py와 같은 기본값 규칙을 따릅니다.
+#       결석 대장 확인 결과는 X-Absence-Findings 헤더(JSON, URL 인코딩)로 돌려줍니다.
+#       대장의 학번은 명단 파일(--roster, 기본 ROSTER_PATH)에서 찾아 화면과 같은 학생으로 기록합니다.
+#   GET /health    상태 확인
+#   GET /metrics   처리 시간 (Prometheus 텍스트, 작업 프로세스별)
+#
+# 부모 프로세스가 모듈 import·양식 준비·학사 일정 읽기를 마친 뒤 포트를 열고 작업 프로세스를
+# fork하므로, 작업 프로세스는 준비된 상태를 그대로 물려받아 첫 요청부터 빠릅니다.
+# 작업 프로세스가 죽으면 부모가 다시 띄웁니다. (fork가 없는 OS에서는 한 프로세스로 실행)
+# ----------------------------------------------------
+
+MAX_BODY = 64 * 1024
+
+_ledger = None
+_roster_path = None
+_variant = None
+
+
+class RequestError(ValueError):
+    pass
+
+
+def job_from_request(fields):
+    """요청 JSON을 render_report 인자로 바꿉니다. true/false는 batch.py CSV의 1/0과 같게 처리합니다."""
+    if not isinstance(fields, dict):
+        raise RequestError("요청 본문은 JSON 객체여야 합니다")
+    missing = [c for c in ("학년", "반", "번호", "이름", "시작일", "종료일") if fields.get(c) in (None, "")]
+    if missing:
+        raise RequestError(f"필수 값이 없습니다: {', '.join(missing)}")
+
+    row = {key: ('1' if value else '0') if isinstance(value, bool) else str(value)
+           for key, value in fields.items() if value is not None}
+    try:
+        job = build_job(row)
+        if row.get('총_일수'):
+            job['data']['총_일수'] = int(row['총_일수'])
+    except (KeyError, ValueError) as e:
+        raise RequestError(f"잘못된 값입니다: {e}") from e
+    if job['data']['결석_종류'] not in ('질병', '인정', '기타'):
+        raise RequestError("결석_종류는 질병/인정/기타 중 하나여야 합니다")
+    return job
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "AbsenceReport/1.0"
+    # 헤더와 본문을 따로 보내므로 Nagle 알고리즘을 끄지 않으면 keep-alive 요청마다 ~40 ms 지연됨
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body, content_type, headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {"status": "ok", "pid": os.getpid()})
+        elif self.path == '/metrics':
+            self._send(200, STATS.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send_json(404, {"error": "없는 경로입니다"})
+
+    def do_POST(self):
+        if self.path != '/report':
+            self._send_json(404, {"error": "없는 경로입니다"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # 본문 길이를 알 수 없으면 다음 요청의 시작도 알 수 없으므로 연결을 닫음
+            self._send_json(400, {"error": "Content-Length가 올바르지 않습니다"})
+            self.close_connection = True
+            return
+        if length > MAX_BODY:
+            self._send_json(413, {"error": "요청 본문이 너무 큽니다"})
+            self.close_connection = True
+            return
+        try:
+            job = job_from_request(json.loads(self.rfile.read(length) or b'null'))
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "JSON 형식이 아닙니다"})
+            return
+        except RequestError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        data = job['data']
+        findings = []
+        args = (data, job['has_diagnosis'], job['has_opinion'], job['etc_doc_val'])
+        if _ledger is not None:
+            # 명단은 파일이 바뀔 때만 다시 읽음
+            key = student_key(data, find_roster(_roster_path))
+            findings = [finding._asdict() for finding in _ledger.check(*args, key=key, issue_date=job['issue_date'])]
+
+        try:
+            excel_bytes = render_report_cached(**job, variant=_variant)
+        except ValueError as e:
+            # 예: 사유 등에 XML에 넣을 수 없는 제어 문자가 있는 경우
+            self._send_json(400, {"error": f"신고서를 만들 수 없습니다: {e}"})
+            return
+        # 신고서를 실제로 만든 뒤에만 결석 대장에 기록
+        if _ledger is not None:
+            _ledger.record(*args, key=key, issue_date=job['issue_date'])
+        file_name = report_file_name(data)
+        with span("download"):
+            self._send(200, excel_bytes, XLSX_MIME, [
+                ('Content-Disposition', f"attachment; filename*=UTF-8''{quote(file_name)}"),
+                ('X-Absence-Findings', quote(json.dumps(findings, ensure_ascii=False))),
+            ])
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ----------------------------------------------------
+# 작업 프로세스 풀 (pre-fork)
+# ----------------------------------------------------
+
+def warm_up(roster_path=None, variant=None):
+    """fork 전에 무거운 준비를 끝내 둠: 양식 템플릿, 학사 일정, 학생 명단, openpyxl import."""
+    get_template(variant=variant)
+    calculate_days(date.today(), date.today())
+    find_roster(roster_path)
+
+
+def _serve(sock, ledger_path, roster_path=None, variant=None):
+    global _ledger, _roster_path, _variant
+    # SQLite 연결은 fork 뒤 프로세스마다 따로 엶
+    _ledger = AbsenceLedger(ledger_path) if ledger_path else None
+    _roster_path = roster_path
+    _variant = variant
+    server = ThreadingHTTPServer(sock.getsockname()[:2], ReportHandler, bind_and_activate=False)
+    server.socket = sock
+    server.daemon_threads = True
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    server.serve_forever()
+
+
+def _spawn(sock, ledger_path, roster_path=None, variant=None):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _serve(sock, ledger_path, roster_path, variant)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def run(host, port, workers, ledger_path, roster_path=ROSTER_PATH, variant=None):
+    warm_up(roster_path, variant)
+    sock = socket.create_server((host, port), backlog=128, reuse_port=False)
+    # 여러 프로세스가 같은 소켓에서 accept하므로, 다른 프로세스가 먼저 가져간 연결을 기다리며 멈추지 않게 함
+    sock.setblocking(False)
+    print(f"결석 신고서 서비스 http://{host}:{port} (작업 프로세스 {workers}개)", flush=True)
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        _serve(sock, ledger_path, roster_path, variant)
+        return 0
+
+    children = {_spawn(sock, ledger_path, roster_path, variant) for _ in range(workers)}
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"작업 프로세스 {pid} 종료 → 다시 시작", file=sys.stderr, flush=True)
+            time.sleep(0.1)
+            children.add(_spawn(sock, ledger_path, roster_path, variant))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="결석 신고서 생성 HTTP 서비스")
+    parser.add_argument("--host", default="127.0.0.1", help="주소 (기본: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8600, help="포트 (기본: 8600)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help=f"결석 대장 SQLite 파일 (기본: {LEDGER_PATH})")
+    parser.add_argument("--no-ledger", action="store_true", help="결석 대장 확인·기록을 하지 않음")
+    parser.add_argument("--roster", default=ROSTER_PATH, help=f"결석 대장 학번을 찾을 학생 명단 파일 (기본: {ROSTER_PATH})")
+    add_variant_arguments(parser)
+    args = parser.parse_args(argv)
+
+    return run(args.host, args.port, args.workers or os.cpu_count() or 1, None if args.no_ledger else args.ledger,
+               args.roster, variant_from_args(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+import argparse
+import re
+import time
+import zipfile
+from datetime import date
+from io import BytesIO
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+
+from ledger import LEDGER_PATH, AbsenceLedger
+from report import CENTER_ALIGN, HEADER_FONT, THIN_BORDER
+from xlsx_template import ZipStreamWriter, escape_text
+
+# ----------------------------------------------------
+# 학기 결석 통계 파일 (결석 목록 + 반별/종류별 소계)
+#
+# 신고서 템플릿(xlsx_template)과 같은 방식입니다. openpyxl로 머리글·열 너비·서식만 있는
+# 빈 통계 파일을 한 번 만들고, 데이터 행은 결석 대장에서 조금씩 읽어 시트 XML로 바로
+# 흘려 쓰면서 압축합니다 (openpyxl write_only보다 훨씬 빠르고, 셀을 메모리에 모으지 않음).
+# 결석이 수만 건이어도 메모리 사용량은 일정합니다. 소계는 SQLite GROUP BY로 계산합니다.
+#
+#   python summary.py 2025-03-01 2025-08-31 -o 1학기_결석통계.xlsx
+# ----------------------------------------------------
+
+ABSENCE_TYPES = ('질병', '인정', '기타')
+
+LIST_HEADERS = ("학년", "반", "번호", "이름", "학번", "결석 종류", "시작일", "종료일", "일수",
+                "사유", "진단서", "의견서", "기타 서류", "신고일")
+LIST_WIDTHS = (6, 6, 6, 10, 9, 9, 12, 12, 6, 36, 7, 7, 16, 12)
+
+CLASS_HEADERS = ("학년", "반") + tuple(
+    f"{absence_type} {kind}" for absence_type in ABSENCE_TYPES for kind in ("건수", "일수")) + ("합계 건수", "합계 일수")
+CLASS_WIDTHS = (6, 6) + (10,) * (len(CLASS_HEADERS) - 2)
+
+TYPE_HEADERS = ("결석 종류", "건수", "일수", "학생 수")
+TYPE_WIDTHS = (10, 10, 10, 10)
+
+SHEETS = (
+    ("결석 목록", LIST_HEADERS, LIST_WIDTHS, 'A2'),
+    ("반별 소계", CLASS_HEADERS, CLASS_WIDTHS, 'C2'),
+    ("종류별 소계", TYPE_HEADERS, TYPE_WIDTHS, None),
+)
+
+DATE_FORMAT = 'yyyy-mm-dd'
+VALUE_ALIGN = Alignment(vertical='center')
+
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+
+class _Date:
+    """날짜 셀 표시 (엑셀 날짜 일련번호 + 날짜 서식)."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, iso):
+        self.value = (date.fromisoformat(iso) - _EXCEL_EPOCH).days
+
+
+class _Total:
+    """합계 행 셀 표시 (머리글 서식)."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class SummaryTemplate:
+    """머리글만 있는 통계 파일을 조각낸 결과. 시트마다 데이터 행 앞/뒤의 XML과 서식 번호를 보관합니다."""
+
+    def __init__(self):
+        wb = Workbook()
+        wb.remove(wb.active)
+        for title, headers, widths, freeze in SHEETS:
+            ws = wb.create_sheet(title)
+            for i, (header, width) in enumerate(zip(headers, widths), start=1):
+                ws.column_dimensions[get_column_letter(i)].width = width
+                cell = ws.cell(row=1, column=i, value=header)
+                cell.font = HEADER_FONT
+                cell.alignment = CENTER_ALIGN
+                cell.border = THIN_BORDER
+            if freeze:
+                ws.freeze_panes = freeze
+
+        # 데이터 셀 서식 견본 (값 / 날짜) — 서식 번호만 읽고 행은 버림
+        ws = wb[SHEETS[0][0]]
+        for column, number_format in ((1, None), (2, DATE_FORMAT)):
+            cell = ws.cell(row=2, column=column, value=0)
+            cell.border = THIN_BORDER
+            cell.alignment = VALUE_ALIGN
+            if number_format:
+                cell.number_format = number_format
+
+        buffer = BytesIO()
+        wb.save(buffer)
+        with zipfile.ZipFile(buffer) as zf:
+            self.names = zf.namelist()
+            self.raw_parts = {name: zf.read(name) for name in self.names}
+
+        first_sheet = self.raw_parts['xl/worksheets/sheet1.xml'].decode('utf-8')
+        self.header_style = re.search(r'<c r="A1" s="(\d+)"', first_sheet).group(1)
+        self.value_style = re.search(r'<c r="A2" s="(\d+)"', first_sheet).group(1)
+        self.date_style = re.search(r'<c r="B2" s="(\d+)"', first_sheet).group(1)
+
+        # 시트 XML을 머리글 행 뒤에서 잘라 둠 (행 수가 바뀌므로 dimension 요소는 뺌)
+        self.sheet_parts = {}
+        for i in range(1, len(SHEETS) + 1):
+            name = f'xl/worksheets/sheet{i}.xml'
+            xml = re.sub(r'<dimension ref="[^"]*"\s*/>', '', self.raw_parts[name].decode('utf-8'))
+            data_start = xml.index('</row>', xml.index('<sheetData>')) + len('</row>')
+            data_end = xml.index('</sheetData>')
+            self.sheet_parts[name] = (xml[:data_start].encode('utf-8'), xml[data_end:].encode('utf-8'))
+
+        self.columns = [get_column_letter(i) for i in range(1, max(len(h) for _, h, _, _ in SHEETS) + 1)]
+
+    def row_xml(self, r, values):
+        cells = [f'<row r="{r}">']
+        for col, value in zip(self.columns, values):
+            ref = f'{col}{r}'
+            if isinstance(value, _Total):
+                style, value = self.header_style, value.value
+            elif isinstance(value, _Date):
+                cells.append(f'<c r="{ref}" s="{self.date_style}"><v>{value.value}</v></c>')
+                continue
+            else:
+                style = self.value_style
+            if value is None or value == "":
+                cells.append(f'<c r="{ref}" s="{style}" />')
+            elif isinstance(value, int):
+                cells.append(f'<c r="{ref}" s="{style}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" s="{style}" t="inlineStr"><is><t>{escape_text(value)}</t></is></c>')
+        cells.append('</row>')
+        return ''.join(cells).encode('utf-8')
+
+    def iter_sheet(self, name, rows):
+        prefix, suffix = self.sheet_parts[name]
+        yield prefix
+        for r, values in enumerate(rows, start=2):
+            yield self.row_xml(r, values)
+        yield suffix
+
+
+def _list_rows(rows, counter):
+    for (key, grade, class_no, number, name, absence_type, start, end, days,
+         reason, has_diagnosis, has_opinion, etc_doc, issue) in rows:
+        counter[0] += 1
+        yield (grade, class_no, number, name, key, absence_type, _Date(start), _Date(end), days,
+               reason, 'O' if has_diagnosis else '', 'O' if has_opinion else '', etc_doc, _Date(issue))
+
+
+def _class_rows(totals):
+    # totals: [(학년, 반, 결석 종류, 건수, 일수, 학생 수)] → 반마다 한 줄로 펼침
+    by_class = {}
+    for grade, class_no, absence_type, n, days, _ in totals:
+        by_class.setdefault((grade, class_no), {})[absence_type] = (n, days)
+
+    grand = {absence_type: [0, 0] for absence_type in ABSENCE_TYPES}
+    for (grade, class_no), per_type in sorted(by_class.items()):
+        row = [grade, class_no]
+        for absence_type in ABSENCE_TYPES:
+            n, days = per_type.get(absence_type, (0, 0))
+            row += [n, days]
+            grand[absence_type][0] += n
+            grand[absence_type][1] += days
+        yield row + [sum(row[2::2]), sum(row[3::2])]
+
+    row = [_Total("전체"), _Total("")]
+    for absence_type in ABSENCE_TYPES:
+        row += [_Total(grand[absence_type][0]), _Total(grand[absence_type][1])]
+    yield row + [_Total(sum(v[0] for v in grand.values())), _Total(sum(v[1] for v in grand.values()))]
+
+
+def _type_rows(totals):
+    # totals: [(결석 종류, 건수, 일수, 학생 수)]
+    found = {absence_type: (n, days, students) for absence_type, n, days, students in totals}
+    for absence_type in ABSENCE_TYPES + tuple(sorted(set(found) - set(ABSENCE_TYPES))):
+        yield (absence_type,) + found.get(absence_type, (0, 0, 0))
+    yield (_Total("전체"), _Total(sum(v[0] for v in found.values())),
+           _Total(sum(v[1] for v in found.values())), _Total(""))
+
+
+def write_term_summary(path, rows, class_totals, type_totals, level=6):
+    """결석 목록(rows: 대장 SUMMARY_COLUMNS 순서의 iterable)과 소계로 통계 파일을 저장하고 행 수를 반환합니다."""
+    template = SummaryTemplate()
+    counter = [0]
+    sheet_rows = {
+        'xl/worksheets/sheet1.xml': _list_rows(rows, counter),
+        'xl/worksheets/sheet2.xml': _class_rows(class_totals),
+        'xl/worksheets/sheet3.xml': _type_rows(type_totals),
+    }
+
+    writer = ZipStreamWriter()
+    with open(path, 'wb') as out:
+        for name in template.names:
+            if name in sheet_rows:
+                for chunk in writer.iter_stream(name, template.iter_sheet(name, sheet_rows[name]), level):
+                    out.write(chunk)
+            else:
+                out.write(writer.add(name, template.raw_parts[name], level))
+        out.write(writer.close())
+    return counter[0]
+
+
+def export_term_summary(ledger, first, last, path):
+    """결석 대장에서 first~last 사이에 시작한 결석으로 학기 통계 파일을 만듭니다."""
+    return write_term_summary(
+        path,
+        ledger.iter_period(first, last),
+        ledger.totals(first, last, ["grade", "class_no", "absence_type"]),
+        ledger.totals(first, last, ["absence_type"]),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="학기 결석 통계 Excel 생성")
+    parser.add_argument("first", type=date.fromisoformat, help="시작일 (예: 2025-03-01)")
+    parser.add_argument("last", type=date.fromisoformat, help="종료일 (예: 2025-08-31)")
+    parser.add_argument("-o", "--output", default="결석통계.xlsx", help="저장할 파일 (기본: 결석통계.xlsx)")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help=f"결석 대장 SQLite 파일 (기본: {LEDGER_PATH})")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    count = export_term_summary(AbsenceLedger(args.ledger), args.first, args.last, args.output)
+    elapsed = time.perf_counter() - started
+    print(f"결석 {count}건 → {args.output} ({elapsed:.2f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
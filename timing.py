@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------------------------------------------
+# 처리 단계별 시간 측정 (span)
+#
+#   with span("build"):
+#       ...
+#
+# 단계마다 최근 WINDOW개 측정값을 보관해 p50/p95를 계산합니다 (프로세스별, 메모리 일정).
+# 단계: page_render(화면 한 번 그리기), build(입력값 채우기), styling(서식 양식 준비),
+#       serialize(.xlsx 저장), download(다운로드 버튼 준비)
+#
+# 내보내기 (환경 변수):
+#   TIMING_LOG    측정마다 JSON 한 줄 기록 — 파일 경로, '-'이면 표준 오류 (기본: 끔)
+#   METRICS_PORT  이 포트에서 Prometheus 텍스트(/metrics)와 JSON(/metrics.json) 제공 (기본: 끔)
+# ----------------------------------------------------
+
+TIMING_LOG = os.environ.get("TIMING_LOG", "")
+METRICS_PORT = os.environ.get("METRICS_PORT", "")
+
+WINDOW = 2048
+QUANTILES = (0.5, 0.95)
+
+logger = logging.getLogger("absence_report.timing")
+
+
+class SpanStats:
+    """단계별 누적 횟수·합계와 최근 측정값 (스레드 안전)."""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._count = {}
+        self._sum = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._count[stage] = 0
+                self._sum[stage] = 0.0
+            samples.append(seconds)
+            self._count[stage] += 1
+            self._sum[stage] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._count.clear()
+            self._sum.clear()
+
+    def snapshot(self):
+        """{단계: {"count", "sum", "p50", "p95"}} (초 단위)."""
+        with self._lock:
+            items = [(stage, sorted(samples), self._count[stage], self._sum[stage])
+                     for stage, samples in self._samples.items()]
+        result = {}
+        for stage, ordered, count, total in sorted(items):
+            stats = {"count": count, "sum": total}
+            for q in QUANTILES:
+                stats[f"p{round(q * 100)}"] = ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+            result[stage] = stats
+        return result
+
+    def prometheus_text(self):
+        """Prometheus 텍스트 형식 (summary 타입)."""
+        lines = [
+            "# HELP absence_report_stage_seconds 결석 신고서 처리 단계별 소요 시간",
+            "# TYPE absence_report_stage_seconds summary",
+        ]
+        for stage, stats in self.snapshot().items():
+            for q in QUANTILES:
+                lines.append(f'absence_report_stage_seconds{{stage="{stage}",quantile="{q}"}} '
+                             f'{stats[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'absence_report_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'absence_report_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+STATS = SpanStats()
+
+
+class span:
+    """with 문 또는 start/end로 쓰는 시간 측정 구간. labels는 JSON 로그에만 붙습니다."""
+
+    __slots__ = ('stage', 'labels', 'started')
+
+    def __init__(self, stage, **labels):
+        self.stage = stage
+        self.labels = labels
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
+
+    def end(self):
+        elapsed = time.perf_counter() - self.started
+        STATS.add(self.stage, elapsed)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"ts": round(time.time(), 3), "stage": self.stage, "ms": round(elapsed * 1000, 3),
+                                    "pid": os.getpid(), **self.labels}, ensure_ascii=False))
+        return elapsed
+
+
+def _configure_log(target):
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == '-' else logging.FileHandler(target, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+_configure_log(TIMING_LOG)
+
+
+# ----------------------------------------------------
+# Prometheus 수집용 HTTP 엔드포인트 (Streamlit 프로세스 안의 데몬 스레드)
+# ----------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = STATS.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/metrics.json':
+            body, content_type = json.dumps(STATS.snapshot()).encode('utf-8'), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host='0.0.0.0'):
+    """한 번만 서버를 띄웁니다 (Streamlit이 스크립트를 다시 실행해도 중복 실행되지 않음)."""
+    global _server
+    port = int(port or METRICS_PORT or 0)
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+    return _server
@@ -0,0 +1,580 @@
+import hashlib
+import os
+import re
+import struct
+import time
+import zlib
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from io import BytesIO
+
+from report import DEFAULT_VARIANT, FormVariant, build_report_workbook, compile_layout, create_excel_report, report_values
+from timing import span
+
+# ----------------------------------------------------
+# 결석 신고서 고속 생성기 (OOXML 템플릿 직접 작성)
+#
+# 신고서 양식은 고정이고 입력값에 따라 바뀌는 칸은 report_values()의 11칸뿐이므로,
+# 양식 변형(FormVariant)마다 openpyxl로 한 번만 양식을 만들어 각 파트의 XML 바이트를 보관해 두고
+# 보고서마다 변동 칸의 문자열만 이스케이프하여 끼워 넣은 뒤 ZIP으로 묶습니다.
+# 고정 파트(스타일, 테마 등)는 압축 결과와 CRC까지 미리 계산해 둡니다.
+#
+# 압축 출력(CompactReportTemplate)은 인쇄 모양은 그대로 두고 파일만 작게 만듭니다 (보관·메일 발송용).
+#
+# 설정 (환경 변수):
+#   REPORT_COMPACT        1이면 기본 생성 결과를 압축 출력으로 (기본: 끔)
+#   REPORT_COMPACT_LEVEL  압축 출력의 deflate 압축 수준 0~9 (기본: 9)
+# ----------------------------------------------------
+
+SHEET_PART = 'xl/worksheets/sheet1.xml'
+CORE_PART = 'docProps/core.xml'
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+
+COMPACT = os.environ.get("REPORT_COMPACT", "") not in ("", "0")
+COMPACT_LEVEL = int(os.environ.get("REPORT_COMPACT_LEVEL", "9"))
+
+# openpyxl이 빈 문자열 칸을 쓰는 방식과 동일하게 값 없는 칸으로 남김
+_EMPTY_CELL = b' />'
+
+# XML 1.0에서 허용되지 않는 제어 문자 (openpyxl과 동일한 기준)
+_ILLEGAL_CHARS = {c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)}
+
+
+def _placeholder(field):
+    return f"@@{field}@@"
+
+
+def escape_text(value):
+    """셀 문자열을 <t> 요소 내용으로 이스케이프합니다."""
+    value = str(value)
+    if any(ord(ch) in _ILLEGAL_CHARS for ch in value):
+        raise ValueError(f"Excel에 쓸 수 없는 제어 문자가 포함되어 있습니다: {value!r}")
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _cell_bytes(value):
+    if value is None or value == "":
+        return _EMPTY_CELL
+    text = escape_text(value)
+    # 앞뒤 공백이 있으면 openpyxl처럼 공백 보존 속성을 붙임
+    if text.strip() != text:
+        return f'><is><t xml:space="preserve">{text}</t></is></c>'.encode('utf-8')
+    return f'><is><t>{text}</t></is></c>'.encode('utf-8')
+
+
+def _dos_datetime(ts):
+    t = time.localtime(ts)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+class ZipPart:
+    """ZIP 항목 하나: 이름, CRC, 원본 크기, 저장할 바이트 (level 0이면 무압축)."""
+
+    __slots__ = ('name', 'crc', 'size', 'method', 'data')
+
+    def __init__(self, name, raw, level):
+        self.name = name.encode('utf-8')
+        self.crc = zlib.crc32(raw)
+        self.size = len(raw)
+        if level == 0:
+            self.method = 0
+            self.data = raw
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            self.method = 8
+            self.data = compressor.compress(raw) + compressor.flush()
+
+    @classmethod
+    def from_chunks(cls, name, chunks, level):
+        """조각 단위로 압축하여, 원본 전체를 메모리에 모으지 않고 항목을 만듭니다."""
+        part = cls.__new__(cls)
+        part.name = name.encode('utf-8')
+        part.method = 8
+        compressor = zlib.compressobj(level or 6, zlib.DEFLATED, -15)
+        crc = 0
+        size = 0
+        data = []
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            data.append(compressor.compress(chunk))
+        data.append(compressor.flush())
+        part.crc = crc
+        part.size = size
+        part.data = b''.join(data)
+        return part
+
+
+class ZipStreamWriter:
+    """항목을 하나씩 ZIP 바이트로 내보내는 작성기. 목차(central directory)만 메모리에 남습니다."""
+
+    # ZIP64를 쓰지 않으므로 항목 수/크기 상한이 있음
+    MAX_ENTRIES = 0xFFFF
+    MAX_OFFSET = 0xFFFFFFFF
+
+    def __init__(self, ts=None):
+        self.dos_time, self.dos_date = _dos_datetime(time.time() if ts is None else ts)
+        self.central = []
+        self.offset = 0
+
+    def add_part(self, part):
+        if len(self.central) >= self.MAX_ENTRIES or self.offset + len(part.data) > self.MAX_OFFSET:
+            raise ValueError("ZIP 항목 수 또는 크기가 한도를 넘었습니다 (ZIP64 미지원)")
+        # 파일 이름이 ASCII가 아니면 UTF-8 플래그(11번 비트)를 켬
+        flags = 0 if part.name.isascii() else 0x800
+        header = struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 20, flags, part.method, self.dos_time, self.dos_date,
+            part.crc, len(part.data), part.size, len(part.name), 0)
+        self.central.append(struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, flags, part.method, self.dos_time, self.dos_date,
+            part.crc, len(part.data), part.size, len(part.name), 0, 0, 0, 0, 0, self.offset) + part.name)
+        self.offset += len(header) + len(part.name) + len(part.data)
+        return header + part.name + part.data
+
+    def add(self, name, raw, level=6):
+        return self.add_part(ZipPart(name, raw, level))
+
+    def iter_stream(self, name, chunks, level=6):
+        """원본 조각을 받는 즉시 압축해 내보냅니다. CRC와 크기는 항목 뒤(data descriptor)에 기록하므로
+        항목 하나가 아무리 커도 메모리에 모아 두지 않습니다."""
+        if len(self.central) >= self.MAX_ENTRIES:
+            raise ValueError("ZIP 항목 수 또는 크기가 한도를 넘었습니다 (ZIP64 미지원)")
+        name = name.encode('utf-8')
+        # 3번 비트: CRC/크기를 data descriptor로 기록, 11번 비트: UTF-8 파일 이름
+        flags = 0x08 | (0 if name.isascii() else 0x800)
+        offset = self.offset
+        header = struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 20, flags, 8, self.dos_time, self.dos_date, 0, 0, 0, len(name), 0)
+        yield header + name
+
+        compressor = zlib.compressobj(level or 6, zlib.DEFLATED, -15)
+        crc = 0
+        size = 0
+        compressed = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            data = compressor.compress(chunk)
+            if data:
+                compressed += len(data)
+                yield data
+        data = compressor.flush()
+        compressed += len(data)
+        if offset + len(header) + len(name) + compressed > self.MAX_OFFSET or size > self.MAX_OFFSET:
+            raise ValueError("ZIP 항목 수 또는 크기가 한도를 넘었습니다 (ZIP64 미지원)")
+        yield data + struct.pack('<IIII', 0x08074b50, crc, compressed, size)
+
+        self.central.append(struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, flags, 8, self.dos_time, self.dos_date,
+            crc, compressed, size, len(name), 0, 0, 0, 0, 0, offset) + name)
+        self.offset = offset + len(header) + len(name) + compressed + 16
+
+    def close(self):
+        central_bytes = b''.join(self.central)
+        count = len(self.central)
+        end = struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count, len(central_bytes), self.offset, 0)
+        return central_bytes + end
+
+
+def write_zip(parts, ts=None):
+    """미리 압축된 ZipPart 목록을 .xlsx(ZIP) 바이트로 묶습니다."""
+    writer = ZipStreamWriter(ts)
+    out = [writer.add_part(part) for part in parts]
+    out.append(writer.close())
+    return b''.join(out)
+
+
+class ReportTemplate:
+    """openpyxl로 한 번 만든 양식을 조각낸 결과. render()는 변동 칸만 채웁니다."""
+
+    # 보고서마다 새로 만드는 파트와, 시트 XML에서 변동 칸을 찾는 표식
+    DYNAMIC_PARTS = (SHEET_PART, CORE_PART)
+    FIELD_CELL = '><is><t>{}</t></is></c>'
+
+    def __init__(self, compress_level=6, variant=DEFAULT_VARIANT):
+        self.compress_level = compress_level
+        self.variant = variant
+        self.fields = compile_layout(variant).fields
+
+        buffer = BytesIO()
+        with span("styling"):
+            build_report_workbook({field: _placeholder(field) for field in self.fields}, variant).save(buffer)
+
+        import zipfile
+        with zipfile.ZipFile(buffer) as zf:
+            names = zf.namelist()
+            raw = {name: zf.read(name) for name in names}
+        names, raw = self._prepare_parts(names, raw)
+
+        self.names = names
+        self.raw_parts = raw
+        self.sheet_chunks, self.sheet_fields = self._split_sheet(raw[SHEET_PART])
+        self.core_chunks = self._split_core(raw[CORE_PART])
+
+        # 여러 시트를 묶을 때 쓰는 정보: 인쇄 영역과 표 머리/값 칸의 스타일 번호
+        workbook_xml = raw['xl/workbook.xml'].decode('utf-8')
+        self.print_range = re.search(r"!(\$A\$1:\$[A-Z]+\$\d+)<", workbook_xml).group(1)
+        sheet_xml = raw[SHEET_PART].decode('utf-8')
+        self.label_style = re.search(r'<c r="A4" s="(\d+)"', sheet_xml).group(1)
+        self.value_style = re.search(r'<c r="C4" s="(\d+)"', sheet_xml).group(1)
+
+        self.static_parts = {
+            name: ZipPart(name, data, compress_level)
+            for name, data in raw.items() if name not in self.DYNAMIC_PARTS
+        }
+
+        # 양식(레이아웃·스타일)이 바뀌면 달라지는 지문: 생성 결과 캐시 키에 포함
+        digest = hashlib.sha256()
+        for chunk in self.sheet_chunks:
+            digest.update(chunk)
+        for name in sorted(self.static_parts):
+            digest.update(name.encode('utf-8'))
+            digest.update(raw[name])
+        self.fingerprint = digest.hexdigest()
+
+    def _prepare_parts(self, names, raw):
+        """openpyxl이 쓴 파트를 조각내기 전에 고칠 기회 (기본: 그대로)."""
+        return names, raw
+
+    def _split_sheet(self, xml):
+        # 변동 칸은 `t="inlineStr"><is><t>@@필드@@</t></is></c>` 형태로 들어 있음
+        chunks = []
+        fields = []
+        rest = xml
+        while True:
+            positions = [
+                (rest.find(self.FIELD_CELL.format(_placeholder(field)).encode('utf-8')), field)
+                for field in self.fields
+            ]
+            positions = [(pos, field) for pos, field in positions if pos >= 0]
+            if not positions:
+                chunks.append(rest)
+                break
+            pos, field = min(positions)
+            chunks.append(rest[:pos])
+            fields.append(field)
+            rest = rest[pos + len(self.FIELD_CELL.format(_placeholder(field)).encode('utf-8')):]
+        if sorted(fields) != sorted(self.fields):
+            raise RuntimeError(f"양식에서 변동 칸을 모두 찾지 못했습니다: {fields}")
+        return chunks, fields
+
+    @staticmethod
+    def _split_core(xml):
+        # 작성/수정 시각은 보고서마다 새로 기록
+        text = xml.decode('utf-8')
+        chunks = []
+        for tag in ('dcterms:created', 'dcterms:modified'):
+            start = text.index('>', text.index(f'<{tag}')) + 1
+            end = text.index(f'</{tag}>', start)
+            chunks.append(text[:start])
+            text = text[end:]
+        chunks.append(text)
+        return [chunk.encode('utf-8') for chunk in chunks]
+
+    def sheet_xml(self, values):
+        sheet = [self.sheet_chunks[0]]
+        for field, chunk in zip(self.sheet_fields, self.sheet_chunks[1:]):
+            sheet.append(_cell_bytes(values[field]))
+            sheet.append(chunk)
+        return b''.join(sheet)
+
+    def core_xml(self, ts):
+        stamp = datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ').encode('ascii')
+        return self.core_chunks[0] + stamp + self.core_chunks[1] + stamp + self.core_chunks[2]
+
+    def dynamic_parts(self, values, ts):
+        """보고서마다 새로 만드는 파트 {이름: XML 바이트}."""
+        return {SHEET_PART: self.sheet_xml(values), CORE_PART: self.core_xml(ts)}
+
+    def render_values(self, values, ts=None):
+        ts = time.time() if ts is None else ts
+        with span("build"):
+            parts = self.dynamic_parts(values, ts)
+        with span("serialize"):
+            dynamic = {name: ZipPart(name, data, self.compress_level) for name, data in parts.items()}
+            return write_zip([dynamic.get(name) or self.static_parts[name] for name in self.names], ts)
+
+    def render(self, data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None):
+        values = report_values(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date,
+                               self.variant)
+        return self.render_values(values)
+
+
+# ----------------------------------------------------
+# 압축 출력 (보관·메일 발송용)
+#
+# 신고서 한 장짜리 파일에서는 내용보다 포장이 더 큽니다. 인쇄 모양은 그대로 두고 다음을 줄입니다.
+#   - 테마: openpyxl 기본 테마(10 KB) 대신 글꼴·색 체계만 있는 최소 테마
+#   - 스타일: 양식의 이름 있는 서식(report.STYLES)마다 한 번씩만 등록된 서식 표를 그대로 쓰되,
+#     기본값과 같은 속성·기본 색 팔레트·빈 요소는 빼고 씀
+#   - 문자열: 칸마다 넣던 인라인 문자열 대신 공유 문자열 표(sharedStrings.xml) 하나로 모음
+#     (같은 문구는 한 번만 저장, 고정 문구 부분은 미리 만들어 둠)
+#   - docProps/app.xml(생성 프로그램 정보) 생략, deflate 압축 수준 조정 (기본 9)
+# ----------------------------------------------------
+
+MINIMAL_THEME = (
+    '<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" name="Office Theme"><a:themeElements>'
+    '<a:clrScheme name="Office">'
+    '<a:dk1><a:sysClr val="windowText" lastClr="000000"/></a:dk1><a:lt1><a:sysClr val="window" lastClr="FFFFFF"/></a:lt1>'
+    '<a:dk2><a:srgbClr val="1F497D"/></a:dk2><a:lt2><a:srgbClr val="EEECE1"/></a:lt2>'
+    '<a:accent1><a:srgbClr val="4F81BD"/></a:accent1><a:accent2><a:srgbClr val="C0504D"/></a:accent2>'
+    '<a:accent3><a:srgbClr val="9BBB59"/></a:accent3><a:accent4><a:srgbClr val="8064A2"/></a:accent4>'
+    '<a:accent5><a:srgbClr val="4BACC6"/></a:accent5><a:accent6><a:srgbClr val="F79646"/></a:accent6>'
+    '<a:hlink><a:srgbClr val="0000FF"/></a:hlink><a:folHlink><a:srgbClr val="800080"/></a:folHlink></a:clrScheme>'
+    # 한글은 테마 글꼴의 Hang 항목(맑은 고딕)으로 찍히므로 기본 테마와 같게 둠
+    '<a:fontScheme name="Office">'
+    '<a:majorFont><a:latin typeface="Cambria"/><a:ea typeface=""/><a:cs typeface=""/>'
+    '<a:font script="Hang" typeface="맑은 고딕"/></a:majorFont>'
+    '<a:minorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/>'
+    '<a:font script="Hang" typeface="맑은 고딕"/></a:minorFont></a:fontScheme>'
+    '<a:fmtScheme name="Office">'
+    '<a:fillStyleLst>' + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3 + '</a:fillStyleLst>'
+    '<a:lnStyleLst>' + ''.join(f'<a:ln w="{w}"><a:solidFill><a:schemeClr val="phClr"/></a:solidFill></a:ln>'
+                               for w in (9525, 25400, 38100)) + '</a:lnStyleLst>'
+    '<a:effectStyleLst>' + '<a:effectStyle><a:effectLst/></a:effectStyle>' * 3 + '</a:effectStyleLst>'
+    '<a:bgFillStyleLst>' + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3 + '</a:bgFillStyleLst>'
+    '</a:fmtScheme></a:themeElements></a:theme>'
+).encode('utf-8')
+
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_SHARED_STRINGS_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml'
+_SHARED_STRINGS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings'
+APP_PART = 'docProps/app.xml'
+
+# (패턴, 바꿀 문자열): 스키마 기본값과 같은 속성·요소는 생략해도 같은 의미
+_COMPACT_RULES = {
+    'xl/styles.xml': (
+        (rb' (?:pivotButton|quotePrefix|hidden)="0"', b''),
+        (rb'<numFmts count="0"\s*/>', b''),
+        # openpyxl이 쓰는 색 팔레트는 Excel 기본 팔레트와 같고, 양식은 RGB 색만 씀
+        (rb'<colors><indexedColors>.*?</indexedColors></colors>', b''),
+        (rb'<tableStyles count="0"[^>]*/>', b''),
+    ),
+    'xl/workbook.xml': (
+        (rb'<workbookPr\s*/>|<workbookProtection\s*/>|<calcPr [^>]*/>', b''),
+        (rb'<workbookView [^>]*/>', b'<workbookView/>'),
+        (rb' state="visible"', b''),
+    ),
+    SHEET_PART: (
+        (rb'<outlinePr summaryBelow="1" summaryRight="1"\s*/>', b''),
+        (rb'<selection activeCell="A1" sqref="A1"\s*/>', b''),
+    ),
+    '_rels/.rels': (
+        (rb'<Relationship [^>]*Target="docProps/app.xml"[^>]*/>', b''),
+    ),
+    '[Content_Types].xml': (
+        (rb'<Override PartName="/docProps/app.xml"[^>]*/>', b''),
+    ),
+}
+
+_INLINE_CELL = re.compile(rb'( t=)"inlineStr"><is>(<t(?: xml:space="preserve")?>)(.*?)</t></is></c>', re.S)
+
+
+class CompactReportTemplate(ReportTemplate):
+    """인쇄 결과는 ReportTemplate과 같고 파일만 작은 템플릿 (최소 테마, 공유 문자열, 높은 압축 수준)."""
+
+    DYNAMIC_PARTS = (SHEET_PART, CORE_PART, SHARED_STRINGS_PART)
+    FIELD_CELL = '><v>{}</v></c>'
+
+    def __init__(self, compress_level=COMPACT_LEVEL, variant=DEFAULT_VARIANT):
+        super().__init__(compress_level, variant)
+
+    def _prepare_parts(self, names, raw):
+        raw = dict(raw)
+        del raw[APP_PART]
+        raw['xl/theme/theme1.xml'] = MINIMAL_THEME
+        for name, rules in _COMPACT_RULES.items():
+            for pattern, replacement in rules:
+                raw[name] = re.sub(pattern, replacement, raw[name], flags=re.S)
+        for name in raw:
+            raw[name] = raw[name].replace(b' />', b'/>')
+
+        raw[SHEET_PART] = self._share_strings(raw[SHEET_PART])
+        raw[SHARED_STRINGS_PART] = b''
+        raw['[Content_Types].xml'] = raw['[Content_Types].xml'].replace(
+            b'</Types>', f'<Override PartName="/{SHARED_STRINGS_PART}" ContentType="{_SHARED_STRINGS_TYPE}"/></Types>'.encode())
+        raw['xl/_rels/workbook.xml.rels'] = raw['xl/_rels/workbook.xml.rels'].replace(
+            b'</Relationships>',
+            f'<Relationship Type="{_SHARED_STRINGS_REL}" Target="sharedStrings.xml" Id="rIdSst"/></Relationships>'.encode())
+
+        names = [name for name in names if name != APP_PART]
+        names.insert(names.index(SHEET_PART) + 1, SHARED_STRINGS_PART)
+        return names, raw
+
+    def _share_strings(self, xml):
+        """시트의 인라인 문자열을 공유 문자열 번호로 바꿉니다. 변동 칸은 `<v>@@필드@@</v>` 표식으로 남깁니다."""
+        # {<si> 바이트: 번호} — 같은 문구는 한 번만 저장
+        self.fixed_strings = {}
+        placeholders = {_placeholder(field).encode('utf-8') for field in self.fields}
+
+        def replace(match):
+            prefix, open_tag, text = match.groups()
+            if text in placeholders:
+                return prefix + b'"s"><v>' + text + b'</v></c>'
+            index = self.fixed_strings.setdefault(b'<si>' + open_tag + text + b'</t></si>', len(self.fixed_strings))
+            return prefix + b'"s"><v>%d</v></c>' % index
+
+        xml = _INLINE_CELL.sub(replace, xml)
+        self.fixed_sst = b''.join(self.fixed_strings)
+        return xml
+
+    def _string_indices(self, values):
+        """변동 칸 값의 공유 문자열 번호와 새로 추가할 <si> 목록. 빈 칸은 번호 없음(None)."""
+        added = {}
+        indices = []
+        for field in self.sheet_fields:
+            value = values[field]
+            if value is None or value == "":
+                indices.append(None)
+                continue
+            text = escape_text(value)
+            open_tag = '<t xml:space="preserve">' if text.strip() != text else '<t>'
+            item = f'<si>{open_tag}{text}</t></si>'.encode('utf-8')
+            index = self.fixed_strings.get(item)
+            if index is None:
+                index = added.setdefault(item, len(self.fixed_strings) + len(added))
+            indices.append(index)
+        return indices, added
+
+    def dynamic_parts(self, values, ts):
+        indices, added = self._string_indices(values)
+        sheet = [self.sheet_chunks[0]]
+        for index, chunk in zip(indices, self.sheet_chunks[1:]):
+            sheet.append(b'/>' if index is None else b'><v>%d</v></c>' % index)
+            sheet.append(chunk)
+        sst = b''.join((f'<sst xmlns="{_NS_MAIN}">'.encode('ascii'), self.fixed_sst, *added, b'</sst>'))
+        return {SHEET_PART: b''.join(sheet), SHARED_STRINGS_PART: sst, CORE_PART: self.core_xml(ts)}
+
+    def sheet_xml(self, values):
+        return self.dynamic_parts(values, time.time())[SHEET_PART]
+
+
+@lru_cache(maxsize=None)
+def _cached_template(compress_level, variant, compact=False):
+    if compact:
+        return CompactReportTemplate(compress_level, variant)
+    return ReportTemplate(compress_level, variant)
+
+
+def get_template(compress_level=None, variant=None, compact=None):
+    """양식 변형·출력 방식별 템플릿 (처음 한 번만 만들고 재사용).
+
+    compact를 생략하면 REPORT_COMPACT 설정을 따르고, 압축 수준을 생략하면
+    일반 출력은 6, 압축 출력은 REPORT_COMPACT_LEVEL을 씁니다.
+    """
+    compact = COMPACT if compact is None else compact
+    if compress_level is None:
+        compress_level = COMPACT_LEVEL if compact else 6
+    return _cached_template(compress_level, variant or DEFAULT_VARIANT, compact)
+
+
+def render_report_fast(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None, variant=None):
+    """report.render_report()와 같은 결과를 템플릿 방식으로 빠르게 생성합니다."""
+    return get_template(variant=variant).render(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date)
+
+
+def render_report_compact(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None,
+                          variant=None):
+    """render_report_fast()와 인쇄 결과가 같은 압축 출력 (보관·메일 발송용)."""
+    return get_template(variant=variant, compact=True).render(
+        data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date)
+
+
+# ----------------------------------------------------
+# 차등 검증: openpyxl로 만든 결과와 셀 값/병합/서식/인쇄 설정 비교
+# ----------------------------------------------------
+
+def _sheet_snapshot(xlsx_bytes):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(BytesIO(xlsx_bytes))
+    ws = wb.active
+    cells = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            if cell.has_style or cell.value is not None:
+                cells[cell.coordinate] = (
+                    cell.value, repr(cell.font), repr(cell.border), repr(cell.alignment),
+                    repr(cell.fill), cell.number_format,
+                )
+    return {
+        "title": ws.title,
+        "cells": cells,
+        "merged": sorted(str(rng) for rng in ws.merged_cells.ranges),
+        "row_heights": {r: d.height for r, d in ws.row_dimensions.items() if d.height is not None},
+        "col_widths": {c: d.width for c, d in ws.column_dimensions.items()},
+        "page_setup": (ws.page_setup.orientation, ws.page_setup.fitToWidth, ws.page_setup.fitToHeight,
+                       ws.sheet_properties.pageSetUpPr.fitToPage if ws.sheet_properties.pageSetUpPr else None),
+        "print_area": ws.print_area,
+    }
+
+
+def compare_with_openpyxl(data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date=None,
+                          variant=None, compact=False):
+    """두 생성 방식의 결과를 비교하여 차이점 목록을 반환합니다 (빈 목록이면 동일)."""
+    if issue_date is None:
+        issue_date = date.today()
+    args = (data, has_diagnosis, has_opinion, etc_doc_val, symptom, parent_opinion, issue_date, variant)
+
+    expected_buffer = BytesIO()
+    create_excel_report(*args).save(expected_buffer)
+    expected = _sheet_snapshot(expected_buffer.getvalue())
+    render = render_report_compact if compact else render_report_fast
+    actual = _sheet_snapshot(render(*args))
+
+    diffs = []
+    for key in expected:
+        if key == "cells":
+            for coord in sorted(set(expected["cells"]) | set(actual["cells"])):
+                if expected["cells"].get(coord) != actual["cells"].get(coord):
+                    diffs.append(f"{coord}: {expected['cells'].get(coord)!r} != {actual['cells'].get(coord)!r}")
+        elif expected[key] != actual[key]:
+            diffs.append(f"{key}: {expected[key]!r} != {actual[key]!r}")
+    return diffs
+
+
+def _sample_cases():
+    base = {"학년": 1, "반": 2, "번호": 3, "이름": "김철수", "총_일수": 3,
+            "시작일": date(2025, 3, 3), "종료일": date(2025, 3, 5), "사유": "독감으로 인한 자가 격리", "결석_종류": "질병"}
+    yield base, True, False, "", "", ""
+    yield dict(base, 결석_종류="인정", 사유=""), False, True, "", "생리통 <복통> & 두통", "월 1회 보건 결석임을 확인합니다."
+    yield dict(base, 결석_종류="기타", 이름="O'Brien \"J\""), False, False, "  가족관계증명서  ", "", ""
+    yield dict(base, 결석_종류="인정"), False, False, "", "", ""
+
+
+# 기본 양식 외에 비교해 볼 양식 변형 (다른 학교·연도 고정·보호자 의견서 없음)
+_SAMPLE_VARIANTS = (None, FormVariant(school_name="한빛고등학교", year=2026, opinion_section=False))
+
+
+def main():
+    failed = 0
+    for compact in (False, True):
+        for variant in _SAMPLE_VARIANTS:
+            for case in _sample_cases():
+                diffs = compare_with_openpyxl(*case, variant=variant, compact=compact)
+                failed += bool(diffs)
+                for diff in diffs:
+                    print(("[압축] " if compact else "") + diff)
+
+    case = next(_sample_cases())
+    n = 200
+    started = time.perf_counter()
+    for _ in range(n):
+        create_excel_report(*case).save(BytesIO())
+    slow = (time.perf_counter() - started) / n
+    render_report_fast(*case)
+    started = time.perf_counter()
+    for _ in range(n):
+        render_report_fast(*case)
+    fast = (time.perf_counter() - started) / n
+
+    print(f"openpyxl: {slow * 1000:.2f} ms/건, 템플릿: {fast * 1000:.3f} ms/건 ({slow / fast:.1f}배)")
+    print(f"파일 크기: 템플릿 {len(render_report_fast(*case)):,} B, 압축 출력 {len(render_report_compact(*case)):,} B")
+    print("차이 없음" if not failed else f"{failed}개 사례에서 차이 발견")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())